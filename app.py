@@ -1,21 +1,29 @@
 import streamlit as st
-import pandas as pd
-import joblib
-import os
+from jyotish.case_index import CaseIndex
+from jyotish.dataset import load_cases as load_case_table
+from jyotish.models import describe as describe_model, get_registry
 
 # === CONFIG FILES===
 st.set_page_config(page_title="JyotishAI", layout="centered")
 st.title("JyotishAI – Your Vedic Astrology Predictor")
 
-# Load model
+# Model: shared registry, loaded on the first prediction
+# (retrain with python -m jyotish.predictor train)
+model = get_registry()
+
+# Load sample data for dropdowns (once per process, not on every rerun).
+# Typed Arrow file, memory-mapped and copied into pandas; rebuild with
+#   python -m jyotish.dataset convert data/raw/kundali_examples.csv
 @st.cache_resource
-def load_model():
-    return joblib.load('model/jyotish_model.pkl')
+def load_cases():
+    return load_case_table('data/clean/kundali.arrow')
 
-model = load_model()
+@st.cache_resource
+def load_case_index():
+    return CaseIndex(load_cases())
 
-# Load sample data for dropdowns
-df = pd.read_csv('data/clean/clean_kundali.csv')
+df = load_cases()
+case_index = load_case_index()
 
 # === SIDEBAR ===
 st.sidebar.header("Enter Birth Details")
@@ -30,23 +38,21 @@ question = st.sidebar.selectbox("Your Question", [
 # === PREDICTION ===
 if st.sidebar.button("Get Prediction"):
     user_input = f"{lagna} {sun} {moon} {question}"
-    pred = model.predict([user_input])[0]
+    pred = model.predict(lagna, sun, moon, question)
     
     st.success("Prediction Ready!")
     st.markdown(f"**Input:** {user_input}")
     st.markdown(f"### {pred}")
     
-    # Show similar real cases
-    matches = df[
-        (df['lagna'] == lagna) |
-        (df['sun'] == sun) |
-        (df['moon'] == moon) |
-        (df['question'] == question)
-    ]
-    if not matches.empty:
-        st.info(f"Found {len(matches)} similar real kundalis")
-        st.dataframe(matches[['birth_date','place','question','prediction']].head(3))
+    # Show similar real cases, ranked by matching placements
+    query = {'lagna': lagna, 'sun': sun, 'moon': moon, 'question': question}
+    rows, scores, found = case_index.top_k(query, k=3)
+    if found:
+        matches = df.iloc[rows][['birth_date','place','question','prediction']].assign(matches=scores)
+        st.info(f"Found {found} similar real kundalis")
+        st.dataframe(matches)
 
 # === FOOTER ===
+st.sidebar.caption(f"Model: {describe_model(model.stats()['predictor'])}")
 st.markdown("---")
 st.markdown("**JyotishAI** – AI-Powered Vedic Insights | FYP 2025")
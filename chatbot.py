@@ -3,16 +3,10 @@
 # Offline • Nepali + English • Voice + Video + Real-Time Chat
 # ========================================
 import streamlit as st
-import ollama
-import re
-import random
-import speech_recognition as sr
-from gtts import gTTS
-import os
-import tempfile
-import cv2
-import av
-from streamlit_webrtc import webrtc_streamer, WebRtcMode, RTCConfiguration
+from jyotish.client import get_backend
+from jyotish.history import Conversation, PAGE, purge_stale
+from jyotish.tracing import span, trace
+from jyotish.tts import TTSEngine
 
 # ========================================
 # 1. MUST BE FIRST: PAGE CONFIG
@@ -29,125 +23,95 @@ st.markdown("<p style='text-align: center; color: #CCCCCC;'>Nepal's First Offlin
 lang = st.sidebar.selectbox("Language / भाषा", ["English", "नेपाली"])
 
 # ========================================
-# 3. MOCK KUNDALI (Deterministic)
+# 3. BACKEND (in-process jyotish.core, or the HTTP service
+#    when JYOTISH_API_URL is set)
 # ========================================
-def get_kundali(birth_date):
-    signs = ['Aries', 'Taurus', 'Gemini', 'Cancer', 'Leo', 'Virgo', 'Libra', 'Scorpio', 'Sagittarius', 'Capricorn', 'Aquarius', 'Pisces']
-    nepali = ['मेष', 'वृष', 'मिथुन', 'कर्कट', 'सिंह', 'कन्या', 'तुला', 'वृश्चिक', 'धनु', 'मकर', 'कुम्भ', 'मीन']
-    random.seed(sum(ord(c) for c in birth_date))
-    idx = random.randint(0, 11)
-    return {
-        'lagna': signs[idx], 'sun': signs[(idx+1)%12], 'moon': signs[(idx+2)%12],
-        'nepali': {'lagna': nepali[idx], 'sun': nepali[(idx+1)%12], 'moon': nepali[(idx+2)%12]}
-    }
+backend = get_backend()
 
 # ========================================
-# 4. EXTRACT DATE & QUESTION
+# 4-6. KUNDALI, OLLAMA ASTROLOGY PREDICTION, GENERAL CHAT
 # ========================================
-def extract_input(text):
-    date_match = re.search(r'\d{4}-\d{2}-\d{2}', text)
-    birth_date = date_match.group() if date_match else None
-    q_map = {
-        'career': 'Career?', 'करियर': 'Career?', 'job': 'Career?',
-        'marriage': 'Marriage?', 'विवाह': 'Marriage?', 'बिहे': 'Marriage?',
-        'health': 'Health?', 'स्वास्थ्य': 'Health?',
-        'future': 'Future?', 'भविष्य': 'Future?'
-    }
-    text_lower = text.lower()
-    question = next((q_map[w] for w in text_lower.split() if w in q_map), None)
-    return birth_date, question
+def reply(prompt, context=None):
+    # Token stream: chart header + astrology answer, or general chat
+    return backend.reply(prompt, lang, context)
 
 # ========================================
-# 5. OLLAMA ASTROLOGY PREDICTION
+# 7. VOICE INPUT ENG / NEPAL (browser mic, VAD, both languages at once)
 # ========================================
-def predict_astrology(kundali, question):
-    prompt = f"""
-    You are JyotishAI. Lagna={kundali['lagna']}, Sun={kundali['sun']}, Moon={kundali['moon']}.
-    Question: {question}
-    Answer in **{lang} only**. 3 sentences. End with a Vedic remedy.
-    """
-    try:
-        res = ollama.chat(model='llama3.2:1b', messages=[{'role': 'user', 'content': prompt}])
-        return res['message']['content']
-    except:
-        return "Try again." if lang == "English" else "पछि प्रयास गर्नुहोस्।"
+def voice_input():
+    # One per session, fed by the browser mic (webrtc audio track); the
+    # recognizer comes from JYOTISH_STT (Google by default)
+    from jyotish.voice import VoiceInput
+    if "voice_input" not in st.session_state:
+        st.session_state.voice_input = VoiceInput()
+    return st.session_state.voice_input
 
-# ========================================
-# 6. GENERAL CHAT (Fallback)
-# ========================================
-def general_chat(prompt):
-    prompt_text = f"Reply in **{lang} only**, short and natural: {prompt}"
-    try:
-        res = ollama.chat(model='llama3.2:1b', messages=[{'role': 'user', 'content': prompt_text}])
-        return res['message']['content']
-    except:
-        return "I'm here!" if lang == "English" else "म यहाँ छु!"
+def voice_stream():
+    # Audio-only webrtc stream for voice mode outside a video call
+    from streamlit_webrtc import webrtc_streamer, WebRtcMode, RTCConfiguration
+    from jyotish.voice import audio_callback
+    return webrtc_streamer(
+        key="voice_stream",
+        mode=WebRtcMode.SENDRECV,
+        rtc_configuration=RTCConfiguration({"iceServers": [
+            {"urls": "stun:stun.l.google.com:19302"}
+        ]}),
+        audio_frame_callback=audio_callback(voice_input()),
+        media_stream_constraints={"video": False, "audio": True},
+        async_processing=True
+    )
 
-# ========================================
-# 7. VOICE INPUT ENG / NEPAL
-# ========================================
-def recognize_speech():
-    r = sr.Recognizer()
-    try:
-        mic_list = sr.Microphone.list_microphone_names()
-        if not mic_list:
-            st.warning("No mic found. Use text.")
-            return ""
-        with sr.Microphone() as source:
-            r.adjust_for_ambient_noise(source, duration=0.5)
-            st.info("Listening... (5 sec)")
-            audio = r.listen(source, timeout=5, phrase_time_limit=5)
-        try:
-            text = r.recognize_google(audio, language="ne-NP")
-            st.success(f"You: {text}")
-            return text
-        except:
-            try:
-                text = r.recognize_google(audio, language="en-IN")
-                st.success(f"You: {text}")
-                return text
-            except:
-                st.warning("Could not understand.")
-                return ""
-    except sr.WaitTimeoutError:
-        st.warning("No speech. Type.")
-        return ""
-    except Exception as e:
-        st.error(f"Mic error: {e}")
-        return ""
+@st.fragment(run_every=0.5)
+def voice_listener():
+    # Polls finished transcripts; the script never waits on the mic
+    voice = st.session_state.get("voice_input")
+    if voice is None:
+        return
+    results = voice.results()
+    if results:
+        st.session_state.voice_prompt = results[-1].text
+        st.rerun()
+    st.caption(f"Mic: {voice.stats()['state']}")
 
 # ========================================
 # 8. VOICE OUTPUT and CLEANUP
 # ========================================
-def speak_text(text):
-    clean = re.sub(r'\*\*|\*|_|\n', ' ', text).strip()
-    clean = clean.split("उपाय:|Remedy:")[0] if "उपाय:" in clean or "Remedy:" in clean else clean
-    try:
-        lang_code = "en" if lang == "English" else "hi"
-        tts = gTTS(clean, lang=lang_code, slow=False)
-        f = tempfile.NamedTemporaryFile(delete=False, suffix=".mp3")
-        tts.save(f.name)
-        return f.name
-    except:
-        return None
+@st.cache_resource
+def tts_engine():
+    return TTSEngine()
+
+def speak_text_async(text):
+    # Synthesis runs on the TTS executor; audio_player() attaches it when ready
+    return tts_engine().submit(text, lang)
+
+@st.fragment(run_every=0.5)
+def audio_player():
+    job = st.session_state.get("tts_job")
+    if job is None or not job.done():
+        return
+    audio = job.result()
+    if audio:
+        st.audio(audio.getvalue(), format=tts_engine().mime)
 
 # ========================================
 # 9. VIDEO CALL + FACE DETECTION
 # ========================================
-def video_frame_callback(frame):
-    img = frame.to_ndarray(format="bgr24")
-    gray = cv2.cvtColor(img, cv2.COLOR_BGR2GRAY)
-    face_cascade = cv2.CascadeClassifier(cv2.data.haarcascades + 'haarcascade_frontalface_default.xml')
-    faces = face_cascade.detectMultiScale(gray, scaleFactor=1.1, minNeighbors=4)
-    for (x, y, w, h) in faces:
-        cv2.rectangle(img, (x, y), (x+w, y+h), (0, 255, 0), 2)
-    return av.VideoFrame.from_ndarray(img, format="bgr24")
-
 # Video Call Button
 if st.button("Start Video Call", key="start_video"):
     st.session_state.in_video_call = True
 
 if st.session_state.get("in_video_call", False):
+    # WebRTC, av and OpenCV are only imported once a call starts
+    from streamlit_webrtc import webrtc_streamer, WebRtcMode, RTCConfiguration
+    from jyotish.video import AsyncFacePipeline, frame_callback
+    from jyotish.voice import audio_callback
+
+    # One pipeline per session (boxes, timing, drop counters); detection
+    # itself runs on the shared frame worker pool
+    if "face_pipeline" not in st.session_state:
+        st.session_state.face_pipeline = AsyncFacePipeline()
+    face_pipeline = st.session_state.face_pipeline
+
     st.subheader("Video Consultation")
     ctx = webrtc_streamer(
         key="video_call",
@@ -155,12 +119,15 @@ if st.session_state.get("in_video_call", False):
         rtc_configuration=RTCConfiguration({"iceServers": [
             {"urls": "stun:stun.l.google.com:19302"}
         ]}),
-        video_frame_callback=video_frame_callback,
+        video_frame_callback=frame_callback(face_pipeline),
+        audio_frame_callback=audio_callback(voice_input()),
         media_stream_constraints={"video": True, "audio": True},
         async_processing=True
     )
     if ctx.state.playing:
         st.success("Camera & Mic ON! Speak your question.")
+        video_stats = face_pipeline.stats()
+        st.caption(f"Face detection: {video_stats['processed']} processed / {video_stats['dropped']} dropped frames")
         if st.button("End Call", key="end_call"):
             st.session_state.in_video_call = False
             st.rerun()
@@ -172,27 +139,50 @@ if st.session_state.get("in_video_call", False):
 # ========================================
 st.subheader("Text & Voice Chat")
 
-if "messages" not in st.session_state:
+@st.cache_resource
+def purge_old_history():
+    # Once per process: drop spill logs of long-finished sessions
+    return purge_stale()
+
+if "conversation" not in st.session_state:
+    purge_old_history()
     welcome = (
         "Namaste! Ask anything — text, voice, or video call!" 
         if lang == "English" else 
         "नमस्ते! टेक्स्ट, आवाज वा भिडियोमा सोध्नुहोस्!"
     )
-    st.session_state.messages = [{"role": "assistant", "content": welcome}]
+    st.session_state.conversation = Conversation()
+    st.session_state.conversation.append("assistant", welcome)
+conversation = st.session_state.conversation
 
 # Display chat
-for msg in st.session_state.messages:
-    with st.chat_message(msg["role"]):
-        st.markdown(msg["content"])
+# Only the latest page(s) render; older turns are spilled to disk
+shown = st.session_state.get("show_messages", PAGE)
+hidden = len(conversation) - shown
+if hidden > 0 and st.button(f"Load earlier messages ({hidden} more)", key="load_earlier"):
+    st.session_state.show_messages = shown + PAGE
+    st.rerun()
+with span('render_history'):
+    for msg in conversation.latest(shown):
+        with st.chat_message(msg["role"]):
+            st.markdown(msg["content"])
 
 # Input
 col1, col2 = st.columns([4, 1])
 with col1:
     prompt = st.chat_input("Type: `2004-06-11, career?` or say 'hi'")
 with col2:
-    if st.button("Speak", key="voice"):
-        with st.spinner("Listening..."):
-            prompt = recognize_speech()
+    voice_on = st.session_state.get("voice_on", False)
+    if st.button("Stop Mic" if voice_on else "Speak", key="voice"):
+        st.session_state.voice_on = not voice_on
+        st.rerun()
+# The video call already carries the mic; otherwise open an audio-only stream
+if st.session_state.get("voice_on") and not st.session_state.get("in_video_call"):
+    voice_stream()
+if st.session_state.get("voice_on") or st.session_state.get("in_video_call"):
+    voice_listener()
+if not prompt:
+    prompt = st.session_state.pop("voice_prompt", None)
 
 # Process Input
 if prompt:
@@ -200,30 +190,29 @@ if prompt:
     if not prompt:
         st.stop()
 
-    st.session_state.messages.append({"role": "user", "content": prompt})
-    with st.chat_message("user"):
-        st.markdown(prompt)
+    # One trace per turn, tagged with the session id so a session's turns
+    # (and their spans on the service) can be found together
+    with trace(conversation.session_id):
+        # A new message makes the previous reply's audio stale
+        stale_job = st.session_state.pop("tts_job", None)
+        if stale_job is not None:
+            stale_job.cancel()
 
-    birth_date, question = extract_input(prompt)
+        context = conversation.context()
+        conversation.append("user", prompt)
+        with st.chat_message("user"):
+            st.markdown(prompt)
 
-    with st.chat_message("assistant"):
-        if birth_date and question:
-            with st.spinner("Predicting..." if lang == "English" else "गणना गर्दै..."):
-                kundali = get_kundali(birth_date)
-                pred = predict_astrology(kundali, question)
-                l = kundali['nepali'] if lang == "नेपाली" else kundali
-                response = f"**Date:** {birth_date}\n**Lagna:** {l['lagna']} | **Sun:** {l['sun']} | **Moon:** {l['moon']}\n\n{pred}"
-        else:
-            response = general_chat(prompt)
+        with st.chat_message("assistant"):
+            # Tokens render as they arrive; the full text is saved once complete
+            with span('stream_reply'):
+                response = st.write_stream(reply(prompt, context))
 
-        st.markdown(response)
-        st.session_state.messages.append({"role": "assistant", "content": response})
+            conversation.append("assistant", response)
 
-        # Speak Response
-        audio_file = speak_text(response)
-        if audio_file:
-            st.audio(audio_file, format="audio/mp3")
-            os.unlink(audio_file)
+            # Speak in the background: text is already on screen
+            st.session_state.tts_job = speak_text_async(response)
+            audio_player()
 
 # ========================================
 # 11. SIDEBAR
@@ -239,6 +228,19 @@ with st.sidebar:
         "• Real-Time Chat\n"
         "• General + Astrology"
     )
+    try:
+        stats = backend.metrics()
+        st.caption(f"Chart cache: {stats['charts']['hits']} hits / {stats['charts']['misses']} misses / {stats['charts']['evictions']} evictions")
+        st.caption(f"Answer cache: {stats['answers']['keys']} keys / {stats['answers']['hits']} hits / {stats['answers']['misses']} misses")
+        st.caption(f"LLM queue: {stats['llm']['queue_depth']} waiting / {stats['llm']['in_flight']} running / {stats['llm']['coalesced']} coalesced")
+        st.caption(f"Offline model: {stats['model']}")
+        stages = {name: s for name, s in stats.get('stages', {}).items() if s['count']}
+        if stages:
+            slowest = max(stages, key=lambda name: stages[name]['mean_ms'])
+            st.caption(f"Slowest stage: {slowest} ({stages[slowest]['mean_ms']:.0f} ms avg / {stages[slowest]['count']} calls)")
+    except Exception:
+        st.caption("Backend metrics unavailable")
     if st.button("Clear Chat"):
-        st.session_state.messages = []
+        conversation.clear()
+        st.session_state.show_messages = PAGE
         st.rerun()
\ No newline at end of file
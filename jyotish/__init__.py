@@ -0,0 +1 @@
+# jyotish – shared, UI-free core used by chatbot.py, kundali.py and app.py
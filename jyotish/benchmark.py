@@ -0,0 +1,322 @@
+# ========================================
+# JyotishAI – End-to-end Benchmark
+# Drives the chat pipeline headlessly (parse -> chart -> rules -> LLM ->
+# speech) from a pool of simulated sessions, against a local Ollama
+# stand-in (jyotish.fake_ollama) and the offline tone TTS backend, while
+# replaying synthetic camera frames through the video-call callback.
+# Reports p50/p95/p99 and throughput per stage and fails when p95,
+# throughput or the answer cache hit rate regress past the saved baseline.
+# Questions come from a small pool of births, so answers repeat and the
+# cached path is exercised too.
+#
+#   python -m jyotish.benchmark                  # check against bench/e2e_baseline.json
+#   python -m jyotish.benchmark --update         # re-record the baseline
+#   python -m jyotish.benchmark --concurrency 16 --token-ms 5
+#   python -m jyotish.benchmark --ollama http://127.0.0.1:11434   # real daemon
+# ========================================
+import argparse
+import json
+import os
+import random
+import sys
+import tempfile
+import threading
+import time
+from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+from datetime import date, timedelta
+
+import numpy as np
+
+from jyotish.stats import percentile
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+BASELINE_PATH = os.path.join(ROOT, "bench", "e2e_baseline.json")
+TOLERANCE = 0.25        # relative slack before a slowdown counts as a regression
+SLACK_MS = 5.0          # absolute slack on p95, so sub-millisecond stages don't fail on noise
+# Settings that must match the baseline for the numbers to be comparable
+CONFIG_KEYS = ('turns', 'concurrency', 'chat_share', 'births', 'token_ms', 'first_token_ms', 'frames', 'fps',
+               'seed')
+BIRTHS = 8              # distinct birth dates asked about, so answers repeat and hit the cache
+
+QUESTIONS = ['career', 'marriage', 'health', 'future']
+ASTRO_TEMPLATES = ["{date} {question}?", "I was born on {date}, what about my {question}?",
+                   "Born {date}. Tell me about {question}"]
+CHAT_MESSAGES = ["hi", "how are you", "what is a kundali?", "namaste", "what does lagna mean?",
+                 "which planet rules Monday?", "thank you"]
+
+
+class Recorder:
+    # Per-stage latency samples, shared by all session threads
+    def __init__(self):
+        self.samples = defaultdict(list)
+        self._lock = threading.Lock()
+
+    def add(self, stage, seconds):
+        with self._lock:
+            self.samples[stage].append(seconds * 1000)
+
+    @contextmanager
+    def stage(self, name):
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.add(name, time.perf_counter() - start)
+
+    def summary(self, wall):
+        out = {}
+        for stage, ms in sorted(self.samples.items()):
+            out[stage] = {
+                'n': len(ms),
+                'p50': round(percentile(ms, 50), 3), 'p95': round(percentile(ms, 95), 3),
+                'p99': round(percentile(ms, 99), 3),
+                'per_s': round(len(ms) / wall, 2) if wall else None,
+            }
+        return out
+
+
+def make_messages(n, chat_share=0.3, seed=0, births=BIRTHS):
+    # Deterministic mix of birth-date questions and small talk; questions
+    # come from a pool of `births` users (0 = a new birth every time)
+    rng = random.Random(seed)
+    first = date(1950, 1, 1)
+    pool = [first + timedelta(days=rng.randrange(60 * 365)) for _ in range(births)]
+    messages = []
+    for _ in range(n):
+        if rng.random() < chat_share:
+            messages.append(rng.choice(CHAT_MESSAGES))
+        else:
+            birth = rng.choice(pool) if pool else first + timedelta(days=rng.randrange(60 * 365))
+            messages.append(rng.choice(ASTRO_TEMPLATES).format(date=birth.isoformat(),
+                                                               question=rng.choice(QUESTIONS)))
+    return messages
+
+
+def make_frames(n, width=640, height=480, seed=0):
+    # Noisy background with a bright blob drifting across it
+    rng = np.random.default_rng(seed)
+    background = rng.integers(0, 60, (height, width, 3), dtype=np.uint8)
+    yy, xx = np.mgrid[0:height, 0:width]
+    frames = []
+    for i in range(n):
+        cx, cy = width * (0.25 + 0.5 * (i % 60) / 60), height / 2
+        blob = ((xx - cx) ** 2 / 70 ** 2 + (yy - cy) ** 2 / 90 ** 2) < 1
+        img = background.copy()
+        img[blob] = (180, 170, 200)
+        frames.append(img)
+    return frames
+
+# ========================================
+# WORKLOADS
+# ========================================
+def run_turn(message, lang, tts, rec):
+    # One chat turn the way chatbot.py handles it, timed per stage
+    from jyotish import core
+    from jyotish.parser import parse
+
+    start = time.perf_counter()
+    with rec.stage('parse'):
+        birth_date, question = parse(message)
+    if birth_date and question:
+        with rec.stage('chart'):
+            kundali = core.charts([{'birth_date': birth_date}])[0]
+        with rec.stage('rules'):
+            core.rules([{'birth_date': birth_date, 'question': question}], lang)
+        text = core.astrology_header(birth_date, kundali, lang)
+        tokens, llm_stage = core.predict_astrology(kundali, question, lang), 'llm_astrology'
+    else:
+        text = ""
+        tokens, llm_stage = core.general_chat(message, lang), 'llm_chat'
+
+    llm_start, first = time.perf_counter(), None
+    for token in tokens:
+        if first is None:
+            first = time.perf_counter()
+            rec.add('llm_first_token', first - llm_start)
+        text += token
+    rec.add(llm_stage, time.perf_counter() - llm_start)
+    with rec.stage('tts'):
+        tts.synthesize(text, lang)
+    rec.add('turn', time.perf_counter() - start)
+    return text
+
+
+def run_video(frames, fps, rec):
+    # Replays frames through the same callback streamlit_webrtc would call
+    from jyotish.video import AsyncFacePipeline, frame_callback
+
+    pipeline = AsyncFacePipeline()
+    try:
+        import av
+        callback = frame_callback(pipeline)
+        inputs = [av.VideoFrame.from_ndarray(img, format="bgr24") for img in frames]
+    except ImportError:
+        # PyAV is only needed for the webrtc wrapper; time the pipeline itself
+        callback, inputs = pipeline.process, frames
+    interval = 1.0 / fps if fps else 0.0
+    next_at = time.perf_counter()
+    for frame in inputs:
+        if interval:
+            delay = next_at - time.perf_counter()
+            if delay > 0:
+                time.sleep(delay)
+            next_at += interval
+        with rec.stage('frame'):
+            callback(frame)
+    return pipeline.stats()
+
+
+def run(turns=200, concurrency=8, chat_share=0.3, token_ms=20.0, first_token_ms=None, frames=90, fps=30,
+        seed=0, lang="English", ollama=None, births=BIRTHS):
+    from jyotish import core
+    from jyotish.chart_cache import ChartCache
+    from jyotish.fake_ollama import FakeOllama
+    from jyotish.llm_gateway import get_gateway
+    from jyotish.response_cache import ResponseCache
+    from jyotish.tts import ToneBackend, TTSEngine
+
+    fake = None
+    if ollama is None:
+        fake = FakeOllama(token_ms, first_token_ms)
+        ollama = fake.start()
+    # Read by ollama.AsyncClient when the gateway makes its first call
+    os.environ['OLLAMA_HOST'] = ollama
+    tmp = tempfile.TemporaryDirectory(prefix="jyotish-bench-")
+    # Cold, throwaway caches so every run starts from the same state
+    core.use_caches(charts=ChartCache(maxsize=4096),
+                    answers=ResponseCache(os.path.join(tmp.name, "responses.sqlite")))
+    tts = TTSEngine(ToneBackend())
+    rec = Recorder()
+    messages = make_messages(turns, chat_share, seed, births)
+    video = {}
+
+    video_thread = None
+    if frames:
+        frame_list = make_frames(frames, seed=seed)
+        video_thread = threading.Thread(target=lambda: video.update(run_video(frame_list, fps, rec)),
+                                         name="bench-video")
+    start = time.perf_counter()
+    try:
+        if video_thread:
+            video_thread.start()
+        with ThreadPoolExecutor(max_workers=concurrency, thread_name_prefix="bench-session") as pool:
+            list(pool.map(lambda m: run_turn(m, lang, tts, rec), messages))
+        if video_thread:
+            video_thread.join()
+    finally:
+        wall = time.perf_counter() - start
+        if fake:
+            fake.stop()
+        tmp.cleanup()
+
+    gateway = get_gateway().metrics()
+    return {
+        'config': {'turns': turns, 'concurrency': concurrency, 'chat_share': chat_share, 'births': births,
+                   'token_ms': token_ms,
+                   'first_token_ms': first_token_ms, 'frames': frames, 'fps': fps, 'seed': seed,
+                   'fake_ollama': fake is not None},
+        'wall_s': round(wall, 3),
+        'turns_per_s': round(turns / wall, 2),
+        'stages': rec.summary(wall),
+        'llm': {k: gateway[k] for k in ('requests', 'coalesced', 'rejected', 'timeouts', 'errors')},
+        'answers': core.response_cache().stats(),
+        'video': {k: video.get(k) for k in ('submitted', 'dropped', 'processed', 'errors')},
+    }
+
+
+def compare(baseline, current, tolerance=TOLERANCE, slack_ms=SLACK_MS):
+    # List of regression messages (p95 per stage, overall throughput, answer cache hit rate)
+    problems = []
+    for stage, base in baseline['stages'].items():
+        cur = current['stages'].get(stage)
+        if cur is None:
+            continue
+        limit = base['p95'] * (1 + tolerance) + slack_ms
+        if cur['p95'] > limit:
+            problems.append(f"{stage} p95 {cur['p95']:.1f} ms > {limit:.1f} ms (baseline {base['p95']:.1f} ms)")
+    floor = baseline['turns_per_s'] * (1 - tolerance)
+    if current['turns_per_s'] < floor:
+        problems.append(f"throughput {current['turns_per_s']:.1f} turns/s < {floor:.1f} "
+                        f"(baseline {baseline['turns_per_s']:.1f})")
+    base_rate, cur_rate = _hit_rate(baseline.get('answers')), _hit_rate(current.get('answers'))
+    if base_rate and (cur_rate or 0) < base_rate * (1 - tolerance):
+        problems.append(f"answer cache hit rate {cur_rate or 0:.0%} < {base_rate * (1 - tolerance):.0%} "
+                        f"(baseline {base_rate:.0%})")
+    return problems
+
+
+def _hit_rate(answers):
+    lookups = (answers or {}).get('hits', 0) + (answers or {}).get('misses', 0)
+    return answers['hits'] / lookups if lookups else None
+
+
+def print_report(result):
+    cfg = result['config']
+    print(f"{cfg['turns']} turns x {cfg['concurrency']} sessions, token {cfg['token_ms']} ms, "
+          f"{cfg['frames']} frames @ {cfg['fps']} fps -> {result['wall_s']:.2f} s, "
+          f"{result['turns_per_s']:.1f} turns/s")
+    print(f"{'stage':16s} {'n':>6s} {'p50 ms':>9s} {'p95 ms':>9s} {'p99 ms':>9s} {'/s':>8s}")
+    for stage, s in result['stages'].items():
+        print(f"{stage:16s} {s['n']:6d} {s['p50']:9.2f} {s['p95']:9.2f} {s['p99']:9.2f} {s['per_s']:8.1f}")
+    print(f"llm: {result['llm']}")
+    print(f"answers: hits {result['answers'].get('hits')} misses {result['answers'].get('misses')}")
+    print(f"video: {result['video']}")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="JyotishAI end-to-end benchmark")
+    parser.add_argument("--turns", type=int, default=200)
+    parser.add_argument("--concurrency", type=int, default=8, help="simulated chat sessions")
+    parser.add_argument("--chat-share", type=float, default=0.3, help="fraction of small-talk messages")
+    parser.add_argument("--births", type=int, default=BIRTHS, help="distinct births asked about (0 = all new)")
+    parser.add_argument("--token-ms", type=float, default=20.0, help="fake Ollama delay per token")
+    parser.add_argument("--first-token-ms", type=float, default=None, help="fake Ollama delay before the first token")
+    parser.add_argument("--frames", type=int, default=90, help="synthetic video frames (0 to skip)")
+    parser.add_argument("--fps", type=float, default=30, help="frame pacing (0 = as fast as possible)")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--lang", default="English", choices=["English", "नेपाली"])
+    parser.add_argument("--ollama", default=None, help="use this Ollama URL instead of the stand-in")
+    parser.add_argument("--baseline", default=BASELINE_PATH)
+    parser.add_argument("--update", action="store_true", help="record this run as the baseline")
+    parser.add_argument("--tolerance", type=float, default=TOLERANCE)
+    parser.add_argument("--json", default=None, help="also write the full result here")
+    args = parser.parse_args(argv)
+
+    result = run(args.turns, args.concurrency, args.chat_share, args.token_ms, args.first_token_ms,
+                 args.frames, args.fps, args.seed, args.lang, args.ollama, args.births)
+    print_report(result)
+    if args.json:
+        with open(args.json, 'w') as f:
+            json.dump(result, f, indent=2, ensure_ascii=False)
+
+    if args.update:
+        if not result['config']['fake_ollama']:
+            print("not recording a baseline against a real Ollama daemon")
+            return 1
+        os.makedirs(os.path.dirname(args.baseline), exist_ok=True)
+        with open(args.baseline, 'w') as f:
+            json.dump({k: result[k] for k in ('config', 'turns_per_s', 'stages', 'answers')}, f, indent=2)
+            f.write("\n")
+        print(f"baseline -> {args.baseline}")
+        return 0
+
+    if not os.path.exists(args.baseline):
+        print(f"no baseline at {args.baseline}; run with --update first")
+        return 1
+    with open(args.baseline) as f:
+        baseline = json.load(f)
+    differs = [k for k in CONFIG_KEYS if baseline['config'].get(k) != result['config'].get(k)]
+    if differs or not result['config']['fake_ollama']:
+        print(f"settings differ from the baseline ({', '.join(differs) or 'real Ollama'}); not compared")
+        return 0
+    problems = compare(baseline, result, args.tolerance)
+    for problem in problems:
+        print(f"REGRESSION {problem}")
+    print("end-to-end benchmark: " + ("FAILED" if problems else "ok"))
+    return 1 if problems else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
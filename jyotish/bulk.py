@@ -0,0 +1,300 @@
+# ========================================
+# JyotishAI – Bulk Readings
+# Readings for thousands of births (newsletters, pre-generated answers)
+# from a CSV/JSONL of births and questions. Input is streamed in chunks:
+# charts, rule readings and model predictions are computed on a process
+# pool, LLM answers run on a bounded number of threads through the shared
+# gateway (filling the response cache the UI reads), and each reading is
+# appended to a JSONL file in input order as soon as it is complete.
+# The output file is the checkpoint: --resume skips ids already in it and
+# retries rows whose LLM answer failed (fallbacks are never recorded).
+#
+#   python -m jyotish.bulk births.csv -o readings.jsonl --workers 4 --llm 2
+#   python -m jyotish.bulk births.csv -o readings.jsonl --resume
+#   python -m jyotish.bulk births.jsonl -o readings.jsonl --no-llm
+#
+# Input columns: birth_date + question (or a free-text "text" column the
+# chat parser understands), optional id, birth_time, place, lang.
+# ========================================
+import argparse
+import csv
+import json
+import multiprocessing
+import os
+import sys
+import time
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from itertools import islice
+
+from jyotish.signs import COLUMNS
+
+CHUNK = 256             # births per process-pool task
+LLM_CONCURRENCY = 2     # matches the gateway's default generation slots
+REPORT_EVERY = 5.0      # seconds between progress lines
+LANGS = ("English", "नेपाली")
+LLM_ERROR = "llm: "     # prefix of rows --resume retries
+
+
+def read_births(path):
+    # Dicts with an 'id' (the id column, else the 1-based record number)
+    with open(path, encoding='utf-8', newline='') as f:
+        if path.endswith(('.jsonl', '.ndjson')):
+            rows = (json.loads(line) for line in f if line.strip())
+        else:
+            rows = csv.DictReader(f)
+        for n, row in enumerate(rows, 1):
+            row = dict(row)
+            row['id'] = str(row.get('id') or n)
+            yield row
+
+
+def chunked(iterable, size):
+    iterator = iter(iterable)
+    while True:
+        chunk = list(islice(iterator, size))
+        if not chunk:
+            return
+        yield chunk
+
+
+def completed_ids(path):
+    # Ids already written; a torn last line (crash mid-write) is cut off and
+    # rows whose LLM answer failed are dropped, so both are computed again
+    done = set()
+    if not os.path.exists(path):
+        return done
+    keep, retry = [], False
+    with open(path, 'rb+') as f:
+        good = 0
+        for line in f:
+            try:
+                row = json.loads(line)
+                row_id = str(row['id'])
+            except (ValueError, KeyError):
+                break
+            good += len(line)
+            if str(row.get('error', '')).startswith(LLM_ERROR):
+                retry = True
+                continue
+            done.add(row_id)
+            keep.append(line)
+        f.truncate(good)
+    if retry:
+        with open(path + '.tmp', 'wb') as f:
+            f.writelines(keep)
+        os.replace(path + '.tmp', path)
+    return done
+
+# ========================================
+# WORKER SIDE (process pool)
+# ========================================
+def _init_worker():
+    # Memory-only chart cache: bulk births rarely repeat, and worker
+    # processes must not contend on the UI's SQLite file
+    from jyotish import core
+    from jyotish.chart_cache import ChartCache
+    core.use_caches(charts=ChartCache(maxsize=4096))
+
+
+def _prepare(row, default_lang):
+    from jyotish.chart_cache import normalize_key
+    from jyotish.parser import QUESTION_KEYWORDS, parse
+
+    birth_date, question = row.get('birth_date'), row.get('question')
+    if row.get('text') and not (birth_date and question):
+        parsed_date, parsed_question = parse(row['text'])
+        birth_date, question = birth_date or parsed_date, question or parsed_question
+    result = {
+        'id': row['id'],
+        'birth_date': (birth_date or '').strip(),
+        'birth_time': (row.get('birth_time') or '').strip() or None,
+        'place': (row.get('place') or '').strip() or None,
+        'question': None,
+        'lang': (row.get('lang') or '').strip() or default_lang,
+    }
+    if question:
+        key = question.strip().rstrip('?').lower()
+        result['question'] = QUESTION_KEYWORDS.get(key) or parse(question)[1]
+    if not result['birth_date']:
+        return result, "missing birth_date"
+    if not result['question']:
+        return result, f"unknown question: {question!r}"
+    if result['lang'] not in LANGS:
+        return result, f"lang must be one of {LANGS}"
+    try:
+        normalize_key(result['birth_date'], result['birth_time'], result['place'])
+    except ValueError as e:
+        return result, f"bad birth date/time: {e}"
+    return result, None
+
+
+def compute_chunk(rows, default_lang="English"):
+    # Charts, rule readings and model predictions for one chunk, through
+    # the same jyotish.core batch calls the UI and the service use
+    from jyotish import core
+
+    results, items = [], []
+    for row in rows:
+        result, error = _prepare(row, default_lang)
+        results.append(result)
+        if error:
+            result['error'] = error
+        else:
+            items.append(result)
+    if not items:
+        return results
+    charts = core.charts(items)
+    predictions = core.predict([{'lagna': c['lagna'], 'sun': c['sun'], 'moon': c['moon'], 'question': i['question']}
+                                for c, i in zip(charts, items)])
+    for item, chart, prediction in zip(items, charts, predictions):
+        item['chart'] = {k: chart[k] for k in COLUMNS}
+        item['prediction'] = prediction
+    for lang in {i['lang'] for i in items}:
+        group = [i for i in items if i['lang'] == lang]
+        for item, reading in zip(group, core.rules(group, lang)):
+            item['rules'] = reading
+    return results
+
+# ========================================
+# DRIVER
+# ========================================
+class FallbackAnswer(ValueError):
+    pass
+
+
+def llm_answer(result):
+    # A fallback (offline text, "Try again.") or a cut-off stream is not an
+    # answer: raising makes the row an error, so --resume retries it
+    from jyotish import core
+    status = {}
+    answer = "".join(core.predict_astrology(result['chart'], result['question'], result['lang'], status))
+    if not status['complete']:
+        raise FallbackAnswer("model unavailable, fallback answer not recorded")
+    return answer
+
+
+class Progress:
+    def __init__(self, report_every=REPORT_EVERY, out=sys.stderr):
+        self.report_every = report_every
+        self.out = out
+        self.start = self._last = time.perf_counter()
+        self.read = self.skipped = self.charted = self.answered = self.written = self.errors = 0
+
+    def maybe_report(self, force=False):
+        now = time.perf_counter()
+        if force or now - self._last >= self.report_every:
+            self._last = now
+            print(self.line(), file=self.out, flush=True)
+
+    def line(self):
+        elapsed = max(time.perf_counter() - self.start, 1e-9)
+        return (f"{self.written} written ({self.errors} errors, {self.skipped} resumed) | "
+                f"{self.written / elapsed:.1f} rows/s | charts {self.charted / elapsed:.1f}/s | "
+                f"llm {self.answered / elapsed:.2f}/s | {elapsed:.0f} s")
+
+    def summary(self):
+        elapsed = time.perf_counter() - self.start
+        return {'read': self.read, 'skipped': self.skipped, 'written': self.written, 'errors': self.errors,
+                'charted': self.charted, 'answered': self.answered, 'seconds': round(elapsed, 2),
+                'rows_per_s': round(self.written / elapsed, 2) if elapsed else None}
+
+
+def run(src, dst, workers=os.cpu_count() or 1, llm_concurrency=LLM_CONCURRENCY, chunk_size=CHUNK,
+        resume=False, llm=True, lang="English", limit=None, progress=None):
+    progress = progress or Progress()
+    skip = completed_ids(dst) if resume else set()
+
+    def pending_rows():
+        for row in islice(read_births(src), limit):
+            progress.read += 1
+            if row['id'] in skip:
+                progress.skipped += 1
+                continue
+            yield row
+
+    if workers > 0:
+        # spawn: workers start clean, without the gateway thread or open SQLite handles
+        charts_pool = ProcessPoolExecutor(workers, mp_context=multiprocessing.get_context('spawn'),
+                                          initializer=_init_worker)
+    else:
+        charts_pool = ThreadPoolExecutor(1)     # in-process, for small runs and debugging
+    llm_pool = ThreadPoolExecutor(max(1, llm_concurrency), thread_name_prefix="bulk-llm")
+    chunks = deque()        # chart futures, in input order
+    rows = deque()          # (result, answer future or None), in input order
+    # Bounds memory and the number of LLM calls queued ahead of the writer
+    max_rows = chunk_size + 8 * max(1, llm_concurrency)
+
+    out = open(dst, 'a' if resume else 'w', encoding='utf-8')
+
+    def write_ready(block_over=None):
+        # Writes finished rows from the head; waits on the head while more
+        # than block_over rows are pending
+        wrote = False
+        while rows:
+            result, answer = rows[0]
+            if answer is not None and not answer.done() and (block_over is None or len(rows) <= block_over):
+                break
+            rows.popleft()
+            if answer is not None:
+                try:
+                    result['answer'] = answer.result()
+                    progress.answered += 1
+                except Exception as e:
+                    result['error'] = f"{LLM_ERROR}{e}"
+            progress.errors += 'error' in result
+            out.write(json.dumps(result, ensure_ascii=False) + "\n")
+            progress.written += 1
+            wrote = True
+        if wrote:
+            out.flush()
+        progress.maybe_report()
+
+    def take_chunk():
+        for result in chunks.popleft().result():
+            if 'error' not in result:
+                progress.charted += 1
+            answer = llm_pool.submit(llm_answer, result) if llm and 'error' not in result else None
+            rows.append((result, answer))
+        write_ready(block_over=max_rows)
+
+    try:
+        for chunk in chunked(pending_rows(), chunk_size):
+            chunks.append(charts_pool.submit(compute_chunk, chunk, lang))
+            while len(chunks) > max(2, 2 * workers):
+                take_chunk()
+            write_ready()
+        while chunks:
+            take_chunk()
+        write_ready(block_over=0)
+    finally:
+        out.close()
+        charts_pool.shutdown(cancel_futures=True)
+        llm_pool.shutdown(cancel_futures=True)
+    progress.maybe_report(force=True)
+    return progress.summary()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="JyotishAI bulk readings (CSV/JSONL in, JSONL out)")
+    parser.add_argument("input", help="CSV or JSONL of births and questions")
+    parser.add_argument("-o", "--output", required=True, help="JSONL readings (also the resume checkpoint)")
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1, help="chart processes (0 = in-process)")
+    parser.add_argument("--llm", type=int, default=LLM_CONCURRENCY, help="concurrent LLM answers")
+    parser.add_argument("--no-llm", action="store_true", help="charts, rules and model predictions only")
+    parser.add_argument("--chunk", type=int, default=CHUNK, help="births per worker task")
+    parser.add_argument("--lang", default="English", choices=LANGS, help="for rows without a lang column")
+    parser.add_argument("--limit", type=int, default=None, help="only the first N input rows")
+    parser.add_argument("--resume", action="store_true", help="append, skipping ids already in the output")
+    parser.add_argument("--overwrite", action="store_true", help="replace an existing output file")
+    args = parser.parse_args(argv)
+
+    if os.path.exists(args.output) and os.path.getsize(args.output) and not (args.resume or args.overwrite):
+        parser.error(f"{args.output} exists; pass --resume to continue it or --overwrite to replace it")
+    summary = run(args.input, args.output, args.workers, args.llm, args.chunk, args.resume,
+                  llm=not args.no_llm, lang=args.lang, limit=args.limit)
+    print(json.dumps(summary))
+
+
+if __name__ == "__main__":
+    main()
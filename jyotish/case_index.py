@@ -0,0 +1,114 @@
+# ========================================
+# JyotishAI – Similar-Case Index
+# Categorical codes + per-value posting lists over the case dataset, so
+# "similar kundalis" costs O(matching rows) instead of a boolean scan of
+# every row, and results are ranked by how many placements agree.
+#
+#   python -m jyotish.case_index --bench 1000000
+# ========================================
+import argparse
+import time
+
+import numpy as np
+import pandas as pd
+
+from jyotish.chart import COLUMNS, SIGNS
+
+INDEXED = COLUMNS + ['question']
+
+
+class CaseIndex:
+    def __init__(self, df, columns=INDEXED):
+        self.size = len(df)
+        self.columns = [c for c in columns if c in df.columns]
+        self.codes = {}         # column -> int16 code per row (-1 = missing)
+        self.categories = {}    # column -> {value: code}
+        self.postings = {}      # column -> list of sorted row-index arrays, one per code
+        for col in self.columns:
+            cat = pd.Categorical(df[col])
+            codes = np.asarray(cat.codes, dtype=np.int16)
+            self.codes[col] = codes
+            self.categories[col] = {v: i for i, v in enumerate(cat.categories)}
+            # Stable argsort groups rows by code while keeping row order
+            order = np.argsort(codes, kind='stable').astype(np.int32)
+            bounds = np.searchsorted(codes[order], np.arange(len(cat.categories) + 1))
+            self.postings[col] = [order[bounds[i]:bounds[i + 1]] for i in range(len(cat.categories))]
+
+    def _rows(self, col, value):
+        code = self.categories.get(col, {}).get(value)
+        return None if code is None else self.postings[col][code]
+
+    def scores(self, query):
+        # Number of matching attributes per row
+        score = np.zeros(self.size, dtype=np.int8)
+        for col, value in query.items():
+            rows = self._rows(col, value)
+            if rows is not None:
+                score[rows] += 1    # rows are unique within one posting list
+        return score
+
+    def top_k(self, query, k=3):
+        # (row positions, scores) of the k best matches, best first; ties keep
+        # row order. Also returns how many rows match at least one attribute.
+        score = self.scores(query)
+        candidates = np.flatnonzero(score)
+        found = len(candidates)
+        if len(candidates) > k:
+            # Partition on -score, then order the survivors stably
+            keep = np.argpartition(-score[candidates], k - 1)[:k]
+            cutoff = score[candidates[keep]].min()
+            candidates = candidates[score[candidates] >= cutoff]
+        order = np.argsort(-score[candidates], kind='stable')[:k]
+        rows = candidates[order]
+        return rows, score[rows], found
+
+# ========================================
+# BENCHMARK
+# ========================================
+def synthetic_cases(n, seed=0):
+    rng = np.random.default_rng(seed)
+    data = {col: pd.Categorical.from_codes(rng.integers(0, 12, n), SIGNS) for col in COLUMNS}
+    questions = ['Career?', 'Marriage?', 'Health?', 'Studies?', 'Wealth?',
+                 'Love Life?', 'Job?', 'Business?', 'Future?', 'Family?']
+    data['question'] = pd.Categorical.from_codes(rng.integers(0, len(questions), n), questions)
+    return pd.DataFrame(data)
+
+
+def bench(n=1_000_000, repeats=20):
+    df = synthetic_cases(n)
+    query = {'lagna': 'Leo', 'sun': 'Gemini', 'moon': 'Aries', 'question': 'Career?'}
+
+    start = time.perf_counter()
+    index = CaseIndex(df)
+    build = time.perf_counter() - start
+
+    # What app.py used to do: 4-way OR filter, first 3 rows, no ranking
+    obj = df.astype(object)
+    start = time.perf_counter()
+    for _ in range(repeats):
+        matches = obj[(obj['lagna'] == query['lagna']) | (obj['sun'] == query['sun'])
+                      | (obj['moon'] == query['moon']) | (obj['question'] == query['question'])]
+        matches.head(3)
+    scan = (time.perf_counter() - start) / repeats
+
+    start = time.perf_counter()
+    for _ in range(repeats):
+        index.top_k(query, 3)
+    lookup = (time.perf_counter() - start) / repeats
+
+    print(f"rows={n:,}  build={build * 1000:.1f} ms")
+    print(f"DataFrame OR scan   {scan * 1000:8.2f} ms/query")
+    print(f"CaseIndex.top_k     {lookup * 1000:8.2f} ms/query  ({scan / lookup:.1f}x)")
+    return {'build': build, 'scan': scan, 'lookup': lookup}
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="JyotishAI similar-case index")
+    parser.add_argument("--bench", type=int, nargs="?", const=1_000_000, help="benchmark on N synthetic rows")
+    args = parser.parse_args(argv)
+    if args.bench:
+        bench(args.bench)
+
+
+if __name__ == "__main__":
+    main()
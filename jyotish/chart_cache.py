@@ -0,0 +1,121 @@
+# ========================================
+# JyotishAI – Chart Cache
+# Bounded in-memory LRU in front of an optional SQLite file, so repeat
+# birth dates survive Streamlit reruns and process restarts.
+# ========================================
+import os
+import sqlite3
+import threading
+from collections import OrderedDict
+from datetime import date
+
+from jyotish.signs import COLUMNS, DEFAULT_TIME, NEPALI_SIGNS, SIGNS, normalize_place
+
+DEFAULT_PATH = "data/cache/charts.sqlite"
+
+
+def normalize_key(birth_date, birth_time=None, place=None):
+    day = date.fromisoformat(str(birth_date).strip()).isoformat()
+    hh, _, mm = (birth_time or DEFAULT_TIME).strip().partition(':')
+    hour, minute = int(hh), int(mm[:2] or 0)
+    if not (0 <= hour <= 23 and 0 <= minute <= 59):
+        raise ValueError(f"birth time out of range: {birth_time!r}")
+    return f"{day}|{hour:02d}:{minute:02d}|{normalize_place(place)}"
+
+
+def _to_chart(codes):
+    chart = {k: SIGNS[c] for k, c in zip(COLUMNS, codes)}
+    chart['nepali'] = {k: NEPALI_SIGNS[c] for k, c in zip(COLUMNS, codes)}
+    return chart
+
+
+class ChartCache:
+    def __init__(self, maxsize=4096, path=None):
+        self.maxsize = maxsize
+        self.path = path
+        self.hits = self.misses = self.evictions = self.disk_hits = 0
+        self._mem = OrderedDict()
+        self._lock = threading.Lock()
+        self._db = None
+        if path:
+            os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+            # One connection shared by Streamlit's script threads
+            self._db = sqlite3.connect(path, check_same_thread=False)
+            self._db.execute("PRAGMA journal_mode=WAL")
+            self._db.execute("CREATE TABLE IF NOT EXISTS charts (key TEXT PRIMARY KEY, codes BLOB NOT NULL)")
+            self._db.commit()
+
+    # ---------- internals ----------
+    def _remember(self, key, codes):
+        self._mem[key] = codes
+        self._mem.move_to_end(key)
+        while len(self._mem) > self.maxsize:
+            self._mem.popitem(last=False)
+            self.evictions += 1
+
+    def _lookup(self, key):
+        codes = self._mem.get(key)
+        if codes is not None:
+            self._mem.move_to_end(key)
+            self.hits += 1
+            return codes
+        if self._db is not None:
+            row = self._db.execute("SELECT codes FROM charts WHERE key = ?", (key,)).fetchone()
+            if row:
+                codes = bytes(row[0])
+                self._remember(key, codes)
+                self.hits += 1
+                self.disk_hits += 1
+                return codes
+        self.misses += 1
+        return None
+
+    def _store(self, items):
+        for key, codes in items:
+            self._remember(key, codes)
+        if self._db is not None and items:
+            self._db.executemany("INSERT OR REPLACE INTO charts VALUES (?, ?)", items)
+            self._db.commit()
+
+    # ---------- public ----------
+    def get(self, birth_date, birth_time=None, place=None):
+        return self.get_many([birth_date], [birth_time], [place])[0]
+
+    def get_many(self, birth_dates, times=None, places=None):
+        n = len(birth_dates)
+        times = times if times is not None else [None] * n
+        places = places if places is not None else [None] * n
+        keys = [normalize_key(d, t, p) for d, t, p in zip(birth_dates, times, places)]
+        with self._lock:
+            found = {k: self._lookup(k) for k in dict.fromkeys(keys)}
+        missing = [k for k, v in found.items() if v is None]
+        if missing:
+            # Compute every miss in one vectorized pass (NumPy loads on the first miss)
+            from jyotish.chart import compute_charts
+            parts = [k.split('|') for k in missing]
+            charts = compute_charts([p[0] for p in parts], [p[1] for p in parts], [p[2] for p in parts])
+            new = [(k, bytes(int(charts[c][i]) for c in COLUMNS)) for i, k in enumerate(missing)]
+            with self._lock:
+                self._store(new)
+            found.update(new)
+        return [_to_chart(found[k]) for k in keys]
+
+    def stats(self):
+        with self._lock:
+            return {
+                'size': len(self._mem), 'maxsize': self.maxsize,
+                'hits': self.hits, 'misses': self.misses,
+                'evictions': self.evictions, 'disk_hits': self.disk_hits,
+            }
+
+    def clear(self):
+        with self._lock:
+            self._mem.clear()
+            if self._db is not None:
+                self._db.execute("DELETE FROM charts")
+                self._db.commit()
+
+    def close(self):
+        if self._db is not None:
+            self._db.close()
+            self._db = None
@@ -0,0 +1,170 @@
+# ========================================
+# JyotishAI – Cleaning Pipeline
+# The Clean_Filter_Visualize.ipynb cleaning cells as a streaming CLI stage:
+# read -> dedupe -> filter -> fill -> write, one chunk at a time, so raw
+# dumps of any size run in constant memory (apart from the 8-byte key per
+# unique row the dedupe stage keeps).
+#
+#   python -m jyotish.clean data/raw/kundali_examples.csv data/clean/clean_kundali.csv
+# ========================================
+import argparse
+import csv
+import hashlib
+import os
+import time
+
+from jyotish.dataset import CSV_COLUMNS, check_header, normalize_fields
+
+DEFAULT_SRC = "data/raw/kundali_examples.csv"
+DEFAULT_DST = "data/clean/clean_kundali.csv"
+CHUNK_ROWS = 50000
+FILL_VALUE = 'Unknown'
+
+VALID_QUESTIONS = ['Career?', 'Marriage?', 'Health?', 'Studies?', 'Wealth?',
+                   'Love Life?', 'Job?', 'Business?', 'Future?', 'Family?']
+
+_QUESTION = CSV_COLUMNS.index('question')
+
+
+class Stage:
+    # Rows in/out and time spent in one pipeline stage
+    def __init__(self, name):
+        self.name = name
+        self.rows_in = self.rows_out = 0
+        self.seconds = 0.0
+
+    def run(self, fn, chunk):
+        start = time.perf_counter()
+        out = fn(chunk)
+        self.seconds += time.perf_counter() - start
+        self.rows_in += len(chunk)
+        self.rows_out += len(out)
+        return out
+
+    def rate(self):
+        return self.rows_in / self.seconds if self.seconds else 0.0
+
+    def __str__(self):
+        return (f"{self.name:8s} {self.rows_in:>10,} in {self.rows_out:>10,} out "
+                f"{self.seconds:8.3f}s {self.rate():>12,.0f} rows/s")
+
+# ========================================
+# STAGES
+# ========================================
+def read_chunks(path, chunk_rows=CHUNK_ROWS, stage=None, malformed=None):
+    # Field lists in chunks; rows that can't be lined up with the header are
+    # counted in `malformed` and dropped
+    with open(path, newline='', encoding='utf-8') as f:
+        reader = csv.reader(f)
+        check_header(path, next(reader))
+        while True:
+            start = time.perf_counter()
+            chunk = []
+            for fields in reader:
+                if not fields:
+                    continue
+                values = normalize_fields(fields)
+                if values is None:
+                    if malformed is not None:
+                        malformed.append(reader.line_num)
+                    continue
+                chunk.append(values)
+                if len(chunk) >= chunk_rows:
+                    break
+            if stage is not None:
+                stage.seconds += time.perf_counter() - start
+                stage.rows_in += len(chunk)
+                stage.rows_out += len(chunk)
+            if not chunk:
+                return
+            yield chunk
+
+
+class Deduper:
+    # drop_duplicates without keeping the rows: a set of 64-bit row digests
+    def __init__(self):
+        self.seen = set()
+
+    def __call__(self, chunk):
+        out = []
+        for values in chunk:
+            key = hashlib.blake2b('\x1f'.join(values).encode('utf-8'), digest_size=8).digest()
+            if key not in self.seen:
+                self.seen.add(key)
+                out.append(values)
+        return out
+
+
+def filter_questions(chunk, valid=frozenset(VALID_QUESTIONS)):
+    return [values for values in chunk if values[_QUESTION] in valid]
+
+
+def fill_missing(chunk):
+    return [[v or FILL_VALUE for v in values] for values in chunk]
+
+
+class CsvSink:
+    # Incremental writer; QUOTE_MINIMAL quotes "City, Nepal". Writes to a
+    # .part file and renames on close so a failed run never leaves a
+    # half-written clean file behind.
+    def __init__(self, path):
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        self.path = path
+        self.tmp = path + ".part"
+        self.file = open(self.tmp, 'w', newline='', encoding='utf-8')
+        self.writer = csv.writer(self.file, quoting=csv.QUOTE_MINIMAL)
+        self.writer.writerow(CSV_COLUMNS)
+
+    def __call__(self, chunk):
+        self.writer.writerows(chunk)
+        return chunk
+
+    def close(self, ok=True):
+        self.file.close()
+        if ok:
+            os.replace(self.tmp, self.path)
+        else:
+            os.remove(self.tmp)
+
+# ========================================
+# PIPELINE
+# ========================================
+def clean_csv(src=DEFAULT_SRC, dst=DEFAULT_DST, chunk_rows=CHUNK_ROWS):
+    # Returns (stages, malformed line numbers)
+    read = Stage('read')
+    stages = [Stage('dedupe'), Stage('filter'), Stage('fill'), Stage('write')]
+    malformed = []
+    sink = CsvSink(dst)
+    steps = list(zip(stages, [Deduper(), filter_questions, fill_missing, sink]))
+    ok = False
+    try:
+        for chunk in read_chunks(src, chunk_rows, read, malformed):
+            for stage, fn in steps:
+                chunk = stage.run(fn, chunk)
+        ok = True
+    finally:
+        sink.close(ok)
+    return [read] + stages, malformed
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="JyotishAI cleaning pipeline")
+    parser.add_argument("src", nargs="?", default=DEFAULT_SRC)
+    parser.add_argument("dst", nargs="?", default=DEFAULT_DST)
+    parser.add_argument("--chunk-rows", type=int, default=CHUNK_ROWS)
+    args = parser.parse_args(argv)
+
+    start = time.perf_counter()
+    stages, malformed = clean_csv(args.src, args.dst, args.chunk_rows)
+    total = time.perf_counter() - start
+    for stage in stages:
+        print(stage)
+    if malformed:
+        print(f"skipped {len(malformed)} malformed rows (first at line {malformed[0]})")
+    rows = stages[0].rows_in
+    print(f"{rows:,} rows -> {stages[-1].rows_out:,} clean in {total:.3f}s "
+          f"({rows / total if total else 0:,.0f} rows/s) -> {args.dst}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,96 @@
+# ========================================
+# JyotishAI – Service Client
+# Same calls as jyotish.core, served by a remote jyotish.service. The
+# Streamlit apps pick one or the other through get_backend():
+#
+#   JYOTISH_API_URL=http://lb.internal:8600 streamlit run chatbot.py
+# ========================================
+import os
+import threading
+
+from jyotish.tracing import current_trace, record_error
+
+API_URL_ENV = "JYOTISH_API_URL"
+TIMEOUT = 10.0          # seconds for batch calls
+CHAT_TIMEOUT = 180.0    # seconds between chunks of a streamed reply
+
+
+class ServiceClient:
+    def __init__(self, url, timeout=TIMEOUT):
+        import requests
+        self.url = url.rstrip('/')
+        self.timeout = timeout
+        # Pooled keep-alive connections, shared by the Streamlit script threads
+        self.session = requests.Session()
+
+    def _headers(self):
+        # The caller's trace (Streamlit session) continues on the service
+        trace_id = current_trace()
+        return {'X-Trace-Id': trace_id} if trace_id else None
+
+    def _post(self, path, payload):
+        response = self.session.post(self.url + path, json=payload, headers=self._headers(), timeout=self.timeout)
+        response.raise_for_status()
+        return response.json()
+
+    def charts(self, births):
+        return self._post('/v1/charts', {'births': births})['charts']
+
+    def predict(self, items):
+        return self._post('/v1/predictions', {'items': items})['predictions']
+
+    def rules(self, items, lang="English"):
+        return self._post('/v1/rules', {'items': items, 'lang': lang})['readings']
+
+    def parse_many(self, texts):
+        return [(p['birth_date'], p['question']) for p in self._post('/v1/parse', {'texts': texts})['parsed']]
+
+    def reply(self, message, lang, context=None):
+        # Like core.reply, a failed call ends in the language fallback (when
+        # nothing was shown yet) instead of an exception in st.write_stream
+        import requests
+        got_chunks = False
+        try:
+            with self.session.post(self.url + '/v1/chat', json={'message': message, 'lang': lang, 'context': context},
+                                   headers=self._headers(), stream=True,
+                                   timeout=(self.timeout, CHAT_TIMEOUT)) as response:
+                response.raise_for_status()
+                response.encoding = 'utf-8'
+                for chunk in response.iter_content(chunk_size=None, decode_unicode=True):
+                    if chunk:
+                        got_chunks = True
+                        yield chunk
+        except requests.RequestException as e:
+            record_error('service', e)
+            if not got_chunks:
+                from jyotish.prompts import general_fallback
+                yield general_fallback(lang)
+
+    def tts(self, text, lang):
+        response = self.session.post(self.url + '/v1/tts', json={'text': text, 'lang': lang},
+                                     headers=self._headers(), timeout=CHAT_TIMEOUT)
+        response.raise_for_status()
+        return None if response.status_code == 204 else response.content
+
+    def metrics(self):
+        response = self.session.get(self.url + '/v1/metrics', timeout=self.timeout)
+        response.raise_for_status()
+        return response.json()
+
+
+_backend = None
+_backend_lock = threading.Lock()
+
+
+def get_backend():
+    # ServiceClient when JYOTISH_API_URL is set, else the in-process core
+    global _backend
+    with _backend_lock:
+        if _backend is None:
+            url = os.environ.get(API_URL_ENV)
+            if url:
+                _backend = ServiceClient(url)
+            else:
+                from jyotish import core
+                _backend = core
+        return _backend
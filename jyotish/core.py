@@ -0,0 +1,124 @@
+# ========================================
+# JyotishAI – UI-free core
+# Everything a front end needs, with the language passed in instead of read
+# from Streamlit widgets. Used in-process by the Streamlit apps and behind
+# the HTTP service (jyotish.service); jyotish.client exposes the same calls
+# over HTTP.
+# ========================================
+import threading
+
+from jyotish.chart_cache import ChartCache, DEFAULT_PATH as CHART_CACHE_PATH
+from jyotish.llm import stream_chat
+from jyotish.llm_gateway import get_gateway
+from jyotish.models import describe as describe_model, get_registry
+from jyotish.parser import parse, parse_many  # parse_many: part of the backend API
+from jyotish.prompts import general_fallback, general_prompt
+from jyotish.rules import get_rulebook
+from jyotish.tracing import get_tracer, span, traced, traced_iter
+from jyotish.response_cache import ResponseCache, cached_astrology, DEFAULT_PATH as RESPONSE_CACHE_PATH
+
+_lock = threading.Lock()
+_charts = None
+_answers = None
+
+
+def chart_cache():
+    global _charts
+    with _lock:
+        if _charts is None:
+            _charts = ChartCache(maxsize=4096, path=CHART_CACHE_PATH)
+        return _charts
+
+
+def response_cache():
+    global _answers
+    with _lock:
+        if _answers is None:
+            _answers = ResponseCache(RESPONSE_CACHE_PATH)
+        return _answers
+
+
+def use_caches(charts=None, answers=None):
+    # Swap in other cache instances (benchmarks run against throwaway ones)
+    global _charts, _answers
+    with _lock:
+        _charts = charts if charts is not None else _charts
+        _answers = answers if answers is not None else _answers
+
+# ========================================
+# CHARTS + PREDICTIONS (batch)
+# ========================================
+@traced('charts')
+def charts(births):
+    # births: [{'birth_date', 'birth_time'?, 'place'?}] -> chart dicts
+    return chart_cache().get_many([b['birth_date'] for b in births],
+                                  [b.get('birth_time') for b in births],
+                                  [b.get('place') for b in births])
+
+
+@traced('predict')
+def predict(items):
+    # items: [{'lagna', 'sun', 'moon', 'question'}] -> trained-model predictions
+    columns = {f: [item.get(f) for item in items] for f in ('lagna', 'sun', 'moon', 'question')}
+    return [str(p) for p in get_registry().get('predictor').predict_batch(columns)]
+
+@traced('rules')
+def rules(items, lang="English"):
+    # items: [{'birth_date', 'birth_time'?, 'place'?, 'question'}] -> rule book
+    # readings {'effects', 'remedy'}, all charts evaluated in one pass
+    return get_rulebook().get().answers(charts(items), [item.get('question') for item in items], lang)
+
+# ========================================
+# CHAT (token iterators)
+# ========================================
+def astrology_header(birth_date, kundali, lang):
+    names = kundali['nepali'] if lang == "नेपाली" else kundali
+    return f"**Date:** {birth_date}\n**Lagna:** {names['lagna']} | **Sun:** {names['sun']} | **Moon:** {names['moon']}\n\n"
+
+
+def offline_prediction(lang):
+    # Trained model answer when Ollama is down (English only; loads lazily)
+    def answer(lagna, sun, moon, question):
+        if lang != "English":
+            return None
+        try:
+            return get_registry().predict(lagna, sun, moon, question)
+        except Exception:
+            return None
+    return answer
+
+
+def predict_astrology(kundali, question, lang, status=None):
+    # Served from the (lagna, sun, moon, question, lang) cache when warm
+    return cached_astrology(response_cache(), kundali['lagna'], kundali['sun'], kundali['moon'], question, lang,
+                            offline=offline_prediction(lang), status=status)
+
+
+def general_chat(prompt, lang, context=None):
+    return stream_chat(general_prompt(prompt, lang, context), general_fallback(lang))
+
+
+def reply(message, lang, context=None):
+    # Chart header + astrology answer when the message has a birth date and
+    # a question, otherwise general chat with the trimmed earlier turns
+    with span('parse'):
+        birth_date, question = parse(message)
+    if birth_date and question:
+        with span('chart'):
+            kundali = chart_cache().get(birth_date)
+        yield astrology_header(birth_date, kundali, lang)
+        yield from traced_iter('llm_astrology', predict_astrology(kundali, question, lang))
+    else:
+        yield from traced_iter('llm_chat', general_chat(message, lang, context))
+
+
+def metrics():
+    book = get_rulebook()
+    return {
+        'charts': chart_cache().stats(),
+        'answers': response_cache().stats(),
+        'llm': get_gateway().metrics(),
+        'model': describe_model(get_registry().stats()['predictor']),
+        'rules': {'reloads': book.reloads, 'error': book.error},
+        'stages': get_tracer().summary(),
+    }
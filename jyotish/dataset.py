@@ -0,0 +1,200 @@
+# ========================================
+# JyotishAI – Case Dataset (columnar)
+# Typed Arrow storage for the kundali cases: sign columns are dictionary
+# encoded with int8 indices over SIGNS (same codes as jyotish.chart; a fixed
+# dictionary also keeps batches appendable to one IPC file), the
+# CSV is converted in chunks with schema validation, and load_table()
+# memory-maps the Arrow IPC file (zero-copy). load_cases() converts that
+# to pandas, which copies: read-only consumers should take the table.
+#
+#   python -m jyotish.dataset convert data/raw/kundali_examples.csv data/clean/kundali.arrow
+#   python -m jyotish.dataset info data/clean/kundali.arrow
+# ========================================
+import argparse
+import csv
+import os
+from datetime import date
+
+import pyarrow as pa
+import pyarrow.ipc as ipc
+import pyarrow.parquet as pq
+
+from jyotish.chart import COLUMNS, SIGNS
+
+DEFAULT_PATH = "data/clean/kundali.arrow"
+CSV_COLUMNS = ['birth_date', 'birth_time', 'place'] + COLUMNS + ['question', 'prediction']
+CHUNK_ROWS = 50000
+
+_SIGN_TYPE = pa.dictionary(pa.int8(), pa.string())
+_SIGN_DICT = pa.array(SIGNS, pa.string())
+_SIGN_CODES = {s: i for i, s in enumerate(SIGNS)}
+
+SCHEMA = pa.schema(
+    [('birth_date', pa.date32()), ('birth_time', pa.string()), ('place', pa.string())]
+    + [(col, _SIGN_TYPE) for col in COLUMNS]
+    + [('question', pa.string()), ('prediction', pa.string())]
+)
+
+
+class DatasetError(ValueError):
+    pass
+
+# ========================================
+# CSV INGEST
+# ========================================
+def normalize_fields(fields):
+    # Stripped field list, or None if the row can't be lined up with
+    # CSV_COLUMNS. Older exports left "City, Nepal" unquoted, which shows up
+    # as exactly one extra field – fold it back into place.
+    if len(fields) == len(CSV_COLUMNS) + 1:
+        fields = fields[:2] + [f"{fields[2].strip()}, {fields[3].strip()}"] + fields[4:]
+    if len(fields) != len(CSV_COLUMNS):
+        return None
+    return [v.strip() for v in fields]
+
+
+def check_header(path, header):
+    header = [h.strip() for h in header]
+    if header != CSV_COLUMNS:
+        raise DatasetError(f"{path}: expected columns {CSV_COLUMNS}, got {header}")
+
+
+def read_csv_rows(path):
+    # Yields (line number, dict)
+    with open(path, newline='', encoding='utf-8') as f:
+        reader = csv.reader(f)
+        check_header(path, next(reader))
+        for line_no, fields in enumerate(reader, start=2):
+            if not fields:
+                continue
+            values = normalize_fields(fields)
+            if values is None:
+                raise DatasetError(f"{path}:{line_no}: expected {len(CSV_COLUMNS)} fields, got {len(fields)}")
+            yield line_no, dict(zip(CSV_COLUMNS, values))
+
+
+def validate_row(row):
+    # Typed values for one row; raises DatasetError on anything off-schema
+    try:
+        birth_date = date.fromisoformat(row['birth_date'])
+    except ValueError:
+        raise DatasetError(f"bad birth_date {row['birth_date']!r}")
+    hh, _, mm = row['birth_time'].partition(':')
+    if not (hh.isdigit() and mm.isdigit() and int(hh) < 24 and int(mm) < 60):
+        raise DatasetError(f"bad birth_time {row['birth_time']!r}")
+    signs = {}
+    for col in COLUMNS:
+        code = _SIGN_CODES.get(row[col])
+        if code is None:
+            raise DatasetError(f"bad {col} sign {row[col]!r}")
+        signs[col] = code
+    if not row['question']:
+        raise DatasetError("empty question")
+    return birth_date, signs
+
+
+def _batch(rows, typed):
+    arrays = [
+        pa.array([t[0] for t in typed], pa.date32()),
+        pa.array([r['birth_time'] for r in rows], pa.string()),
+        pa.array([r['place'] for r in rows], pa.string()),
+    ]
+    for col in COLUMNS:
+        codes = pa.array([t[1][col] for t in typed], pa.int8())
+        arrays.append(pa.DictionaryArray.from_arrays(codes, _SIGN_DICT))
+    arrays.append(pa.array([r['question'] for r in rows], pa.string()))
+    arrays.append(pa.array([r['prediction'] for r in rows], pa.string()))
+    return pa.RecordBatch.from_arrays(arrays, schema=SCHEMA)
+
+
+def _open_writer(path):
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    if path.endswith('.parquet'):
+        return pq.ParquetWriter(path, SCHEMA)
+    # Uncompressed Arrow IPC: loads by memory-mapping, no decode step
+    return ipc.new_file(path, SCHEMA)
+
+
+def write_batches(path, batches):
+    writer = _open_writer(path)
+    rows = 0
+    try:
+        for batch in batches:
+            writer.write_batch(batch)
+            rows += batch.num_rows
+    finally:
+        writer.close()
+    return rows
+
+
+def convert_csv(src, dst=DEFAULT_PATH, chunk_rows=CHUNK_ROWS, strict=False):
+    # Streams the CSV in chunks; bad rows raise in strict mode, else are skipped
+    rejected = []
+
+    def batches():
+        rows, typed = [], []
+        for line_no, row in read_csv_rows(src):
+            try:
+                typed.append(validate_row(row))
+            except DatasetError as e:
+                if strict:
+                    raise DatasetError(f"{src}:{line_no}: {e}")
+                rejected.append((line_no, str(e)))
+                continue
+            rows.append(row)
+            if len(rows) >= chunk_rows:
+                yield _batch(rows, typed)
+                rows, typed = [], []
+        if rows:
+            yield _batch(rows, typed)
+
+    written = write_batches(dst, batches())
+    return written, rejected
+
+# ========================================
+# LOAD
+# ========================================
+def load_table(path=DEFAULT_PATH):
+    if path.endswith('.parquet'):
+        return pq.read_table(path, memory_map=True)
+    with pa.memory_map(path, 'r') as source:
+        return ipc.open_file(source).read_all()
+
+
+def load_cases(path=DEFAULT_PATH):
+    # DataFrame with Categorical sign/place/question columns; a copy of the
+    # mapped file (no parsing), so memory is one in-memory copy of the data
+    table = load_table(path)
+    if not table.schema.equals(SCHEMA, check_metadata=False):
+        raise DatasetError(f"{path}: schema does not match jyotish.dataset.SCHEMA")
+    df = table.to_pandas(date_as_object=False)
+    for col in ('place', 'question'):
+        df[col] = df[col].astype('category')
+    return df
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="JyotishAI case dataset")
+    sub = parser.add_subparsers(dest="cmd", required=True)
+    conv = sub.add_parser("convert", help="CSV -> Arrow (.arrow) or Parquet (.parquet)")
+    conv.add_argument("src")
+    conv.add_argument("dst", nargs="?", default=DEFAULT_PATH)
+    conv.add_argument("--chunk-rows", type=int, default=CHUNK_ROWS)
+    conv.add_argument("--strict", action="store_true", help="fail on the first invalid row")
+    info = sub.add_parser("info", help="print schema and row count")
+    info.add_argument("path", nargs="?", default=DEFAULT_PATH)
+    args = parser.parse_args(argv)
+
+    if args.cmd == "convert":
+        written, rejected = convert_csv(args.src, args.dst, args.chunk_rows, args.strict)
+        for line_no, err in rejected[:10]:
+            print(f"skipped line {line_no}: {err}")
+        print(f"{written} rows -> {args.dst} ({len(rejected)} rejected)")
+    else:
+        table = load_table(args.path)
+        print(table.schema)
+        print(f"{table.num_rows} rows, {table.nbytes / 1024:.1f} KiB in memory")
+
+
+if __name__ == "__main__":
+    main()
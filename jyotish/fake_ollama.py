@@ -0,0 +1,113 @@
+# ========================================
+# JyotishAI – Ollama Stand-in
+# Minimal /api/chat (and /api/tags) server that streams canned tokens with
+# a tunable delay, so the chat pipeline can be run and benchmarked without
+# the real daemon or a model download.
+#
+#   python -m jyotish.fake_ollama --port 11555 --token-ms 20
+#   OLLAMA_HOST=http://127.0.0.1:11555 streamlit run chatbot.py
+# ========================================
+import argparse
+import asyncio
+import json
+import threading
+import time
+
+from aiohttp import web
+
+DEFAULT_PORT = 11555
+TOKENS = ("Your ", "stars ", "favour ", "patience ", "and ", "steady ", "effort ", "this ", "year.")
+# Last token rotates per request, so repeated prompts get distinct answers
+# and fill the response cache's variants the way a sampling model does
+ENDINGS = ("year.", "season.", "month.", "week.", "spring.")
+
+
+class FakeOllama:
+    def __init__(self, token_ms=20.0, first_token_ms=None, tokens=TOKENS, endings=ENDINGS):
+        self.token_ms = token_ms
+        self.first_token_ms = token_ms if first_token_ms is None else first_token_ms
+        self.tokens = tokens
+        self.endings = endings
+        self.requests = 0
+        self.url = None
+        self._loop = None
+        self._runner = None
+        self._thread = None
+
+    def _chunk(self, model, content, done):
+        return {'model': model, 'created_at': time.strftime('%Y-%m-%dT%H:%M:%SZ', time.gmtime()),
+                'message': {'role': 'assistant', 'content': content}, 'done': done}
+
+    async def chat(self, request):
+        body = await request.json()
+        self.requests += 1
+        model = body.get('model', 'fake')
+        tokens = self.tokens
+        if self.endings:
+            tokens = tokens[:-1] + (self.endings[self.requests % len(self.endings)],)
+        if not body.get('stream', True):
+            await asyncio.sleep((self.first_token_ms + self.token_ms * (len(tokens) - 1)) / 1000)
+            return web.json_response(self._chunk(model, "".join(tokens), True))
+        response = web.StreamResponse(headers={'Content-Type': 'application/x-ndjson'})
+        await response.prepare(request)
+        for i, token in enumerate(tokens):
+            await asyncio.sleep((self.first_token_ms if i == 0 else self.token_ms) / 1000)
+            await response.write((json.dumps(self._chunk(model, token, False)) + "\n").encode())
+        await response.write((json.dumps(self._chunk(model, "", True)) + "\n").encode())
+        await response.write_eof()
+        return response
+
+    async def tags(self, request):
+        return web.json_response({'models': [{'name': 'llama3.2:1b'}]})
+
+    def make_app(self):
+        app = web.Application()
+        app.router.add_post('/api/chat', self.chat)
+        app.router.add_get('/api/tags', self.tags)
+        return app
+
+    # ---------- background thread (benchmarks) ----------
+    def start(self, host="127.0.0.1", port=0):
+        # Serves on its own loop thread; port 0 picks a free port
+        ready = threading.Event()
+
+        async def serve():
+            self._runner = web.AppRunner(self.make_app())
+            await self._runner.setup()
+            site = web.TCPSite(self._runner, host, port)
+            await site.start()
+            bound = site._server.sockets[0].getsockname()[1]
+            self.url = f"http://{host}:{bound}"
+            ready.set()
+
+        self._loop = asyncio.new_event_loop()
+        self._thread = threading.Thread(target=self._loop.run_forever, name="fake-ollama", daemon=True)
+        self._thread.start()
+        asyncio.run_coroutine_threadsafe(serve(), self._loop)
+        if not ready.wait(10):
+            raise RuntimeError("fake Ollama server did not start")
+        return self.url
+
+    def stop(self):
+        if self._loop is None:
+            return
+        asyncio.run_coroutine_threadsafe(self._runner.cleanup(), self._loop).result(10)
+        self._loop.call_soon_threadsafe(self._loop.stop)
+        self._thread.join(timeout=5)
+        self._loop = None
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Fake Ollama server for offline runs")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=DEFAULT_PORT)
+    parser.add_argument("--token-ms", type=float, default=20.0, help="delay between streamed tokens")
+    parser.add_argument("--first-token-ms", type=float, default=None, help="delay before the first token")
+    args = parser.parse_args(argv)
+    fake = FakeOllama(args.token_ms, args.first_token_ms)
+    print(f"fake Ollama on http://{args.host}:{args.port}")
+    web.run_app(fake.make_app(), host=args.host, port=args.port, print=None)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,114 @@
+# ========================================
+# JyotishAI – Conversation Store
+# Keeps the latest turns of a chat session in memory and spills older ones
+# to an append-only JSONL log per session, so long sessions cost the same
+# per rerun as short ones. Pages of earlier turns are read back by offset;
+# the LLM only gets a trimmed context window.
+# ========================================
+import json
+import os
+import threading
+import time
+import uuid
+from collections import deque
+
+DEFAULT_DIR = "data/cache/history"
+WINDOW = 100            # messages kept in memory per session
+PAGE = 20               # messages rendered per "load earlier" step
+CONTEXT_MESSAGES = 6    # most recent messages sent to the LLM
+CONTEXT_CHARS = 1500    # and at most this much text
+MESSAGE_CHARS = 400     # per message, in the LLM context
+MAX_AGE = 7 * 24 * 3600
+
+
+class Conversation:
+    def __init__(self, root=DEFAULT_DIR, window=WINDOW, session_id=None):
+        self.root = root
+        self.window = window
+        self.session_id = session_id or uuid.uuid4().hex
+        self.path = os.path.join(root, f"{self.session_id}.jsonl")
+        self._recent = deque()
+        self._offsets = []      # byte offset of every spilled message
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return len(self._offsets) + len(self._recent)
+
+    @property
+    def spilled(self):
+        return len(self._offsets)
+
+    def append(self, role, content):
+        with self._lock:
+            self._recent.append({'role': role, 'content': content})
+            if len(self._recent) > self.window:
+                self._spill(len(self._recent) - self.window)
+
+    def _spill(self, n):
+        os.makedirs(self.root, exist_ok=True)
+        with open(self.path, 'ab') as f:
+            for _ in range(n):
+                msg = self._recent.popleft()
+                self._offsets.append(f.tell())
+                line = json.dumps([msg['role'], msg['content']], ensure_ascii=False, separators=(',', ':'))
+                f.write(line.encode('utf-8') + b"\n")
+
+    def _read_spilled(self, start, stop):
+        if start >= stop:
+            return []
+        with open(self.path, 'rb') as f:
+            f.seek(self._offsets[start])
+            out = []
+            for _ in range(stop - start):
+                role, content = json.loads(f.readline())
+                out.append({'role': role, 'content': content})
+        return out
+
+    def page(self, start, stop=None):
+        # Messages [start, stop) by position in the whole conversation
+        with self._lock:
+            total = len(self)
+            stop = total if stop is None else min(stop, total)
+            start = max(0, start)
+            spilled = self.spilled
+            older = self._read_spilled(start, min(stop, spilled))
+            recent = list(self._recent)[max(0, start - spilled):max(0, stop - spilled)]
+        return older + recent
+
+    def latest(self, n=PAGE):
+        return self.page(len(self) - n)
+
+    def context(self, max_messages=CONTEXT_MESSAGES, max_chars=CONTEXT_CHARS):
+        # Trailing messages for the LLM, newest kept first when over budget
+        with self._lock:
+            picked, used = [], 0
+            for msg in reversed(self._recent):
+                if len(picked) >= max_messages:
+                    break
+                text = msg['content'][:MESSAGE_CHARS]
+                if used + len(text) > max_chars:
+                    break
+                picked.append({'role': msg['role'], 'content': text})
+                used += len(text)
+        return picked[::-1]
+
+    def clear(self):
+        with self._lock:
+            self._recent.clear()
+            self._offsets = []
+            if os.path.exists(self.path):
+                os.remove(self.path)
+
+
+def purge_stale(root=DEFAULT_DIR, max_age=MAX_AGE):
+    # Spill logs of sessions that ended long ago
+    if not os.path.isdir(root):
+        return 0
+    cutoff = time.time() - max_age
+    removed = 0
+    for name in os.listdir(root):
+        path = os.path.join(root, name)
+        if name.endswith('.jsonl') and os.path.getmtime(path) < cutoff:
+            os.remove(path)
+            removed += 1
+    return removed
@@ -0,0 +1,31 @@
+# ========================================
+# JyotishAI – Ollama helpers
+# All calls go through the shared LLM gateway (jyotish.llm_gateway).
+# ========================================
+from jyotish.llm_gateway import MODEL, get_gateway
+from jyotish.tracing import record_error
+
+
+def stream_chat(content, fallback, model=MODEL, status=None):
+    # Yields tokens as Ollama produces them; the fallback text is only
+    # yielded when the call fails (or is rejected) before any token arrived.
+    # A callable fallback is only evaluated then. status (a dict) gets
+    # 'complete': True only when the model finished its answer, so callers
+    # storing answers can tell a cut-off stream or a fallback apart.
+    got_tokens = False
+    if status is not None:
+        status['complete'] = False
+    try:
+        for token in get_gateway().stream(content, model):
+            got_tokens = True
+            yield token
+        if status is not None:
+            status['complete'] = True
+    except Exception as e:
+        record_error('llm', e)
+        if not got_tokens:
+            yield fallback() if callable(fallback) else fallback
+
+
+def chat(content, fallback, model=MODEL):
+    return "".join(stream_chat(content, fallback, model))
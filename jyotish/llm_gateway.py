@@ -0,0 +1,188 @@
+# ========================================
+# JyotishAI – LLM Gateway
+# One pooled ollama.AsyncClient per process, a bounded queue in front of
+# the local daemon, and coalescing of identical in-flight prompts.
+# ========================================
+import asyncio
+import queue
+import threading
+import time
+from collections import deque
+
+from jyotish.stats import percentile
+
+MODEL = 'llama3.2:1b'
+
+MAX_CONCURRENCY = 2     # generations running against the daemon at once
+MAX_QUEUE = 16          # distinct prompts waiting or running before we reject
+QUEUE_TIMEOUT = 30.0    # seconds a prompt may wait for a slot
+TIMEOUT = 120.0         # seconds a generation may take once started
+
+_DONE = object()
+
+
+class GatewayBusy(RuntimeError):
+    pass
+
+
+class _Flight:
+    # One generation, fanned out to every caller that asked for the same prompt
+    def __init__(self):
+        self.tokens = []
+        self.subscribers = []
+
+    def publish(self, item):
+        for put in list(self.subscribers):
+            put(item)
+
+
+class LLMGateway:
+    def __init__(self, host=None, model=MODEL, max_concurrency=MAX_CONCURRENCY,
+                 max_queue=MAX_QUEUE, queue_timeout=QUEUE_TIMEOUT, timeout=TIMEOUT):
+        self.host = host
+        self.model = model
+        self.max_concurrency = max_concurrency
+        self.max_queue = max_queue
+        self.queue_timeout = queue_timeout
+        self.timeout = timeout
+
+        self._flights = {}
+        self._client = None
+        self._sem = None
+        self._waiting = self._running = 0
+        self.requests = self.coalesced = self.rejected = self.timeouts = self.errors = 0
+        self._latency = deque(maxlen=1000)
+        self._ttft = deque(maxlen=1000)
+
+        # Streamlit runs scripts on plain threads, so the gateway owns its loop
+        self._loop = asyncio.new_event_loop()
+        self._thread = threading.Thread(target=self._loop.run_forever, name="llm-gateway", daemon=True)
+        self._thread.start()
+
+    # ---------- loop side ----------
+    async def _subscribe(self, key, put):
+        self.requests += 1
+        flight = self._flights.get(key)
+        if flight is None:
+            if len(self._flights) >= self.max_queue:
+                self.rejected += 1
+                raise GatewayBusy(f"{len(self._flights)} prompts already queued")
+            if self._client is None:
+                import ollama     # ~0.5 s of imports; paid on the first LLM call, not at startup
+                self._client = ollama.AsyncClient(host=self.host)
+                self._sem = asyncio.Semaphore(self.max_concurrency)
+            flight = self._flights[key] = _Flight()
+            self._loop.create_task(self._run(key, flight))
+        else:
+            self.coalesced += 1
+        for token in flight.tokens:
+            put(token)
+        flight.subscribers.append(put)
+        return flight
+
+    async def _generate(self, flight, model, content, start):
+        stream = await self._client.chat(model=model, messages=[{'role': 'user', 'content': content}], stream=True)
+        async for chunk in stream:
+            token = chunk['message']['content']
+            if token:
+                if not flight.tokens:
+                    self._ttft.append(time.perf_counter() - start)
+                flight.tokens.append(token)
+                flight.publish(token)
+
+    async def _run(self, key, flight):
+        model, content = key
+        start = time.perf_counter()
+        try:
+            self._waiting += 1
+            try:
+                await asyncio.wait_for(self._sem.acquire(), self.queue_timeout)
+            finally:
+                self._waiting -= 1
+            self._running += 1
+            try:
+                await asyncio.wait_for(self._generate(flight, model, content, start), self.timeout)
+            finally:
+                self._running -= 1
+                self._sem.release()
+            self._latency.append(time.perf_counter() - start)
+            flight.publish(_DONE)
+        except asyncio.TimeoutError as e:
+            self.timeouts += 1
+            flight.publish(e)
+        except Exception as e:
+            self.errors += 1
+            flight.publish(e)
+        finally:
+            del self._flights[key]
+
+    def _unsubscribe(self, flight, put):
+        if put in flight.subscribers:
+            flight.subscribers.remove(put)
+
+    # ---------- caller side ----------
+    def stream(self, content, model=None):
+        # Blocking token iterator for Streamlit script threads
+        out = queue.Queue()
+        key = (model or self.model, content)
+        flight = asyncio.run_coroutine_threadsafe(self._subscribe(key, out.put), self._loop).result()
+        try:
+            while True:
+                item = out.get(timeout=self.queue_timeout + self.timeout)
+                if item is _DONE:
+                    return
+                if isinstance(item, BaseException):
+                    raise item
+                yield item
+        finally:
+            self._loop.call_soon_threadsafe(self._unsubscribe, flight, out.put)
+
+    def chat(self, content, model=None):
+        return "".join(self.stream(content, model))
+
+    async def astream(self, content, model=None):
+        # Token iterator for coroutines running on any other event loop
+        caller = asyncio.get_running_loop()
+        out = asyncio.Queue()
+
+        def put(item):
+            caller.call_soon_threadsafe(out.put_nowait, item)
+
+        key = (model or self.model, content)
+        flight = await asyncio.wrap_future(asyncio.run_coroutine_threadsafe(self._subscribe(key, put), self._loop))
+        try:
+            while True:
+                item = await out.get()
+                if item is _DONE:
+                    return
+                if isinstance(item, BaseException):
+                    raise item
+                yield item
+        finally:
+            self._loop.call_soon_threadsafe(self._unsubscribe, flight, put)
+
+    def metrics(self):
+        latency, ttft = list(self._latency), list(self._ttft)
+        return {
+            'queue_depth': self._waiting, 'in_flight': self._running,
+            'requests': self.requests, 'coalesced': self.coalesced,
+            'rejected': self.rejected, 'timeouts': self.timeouts, 'errors': self.errors,
+            'latency_p50': percentile(latency, 50), 'latency_p95': percentile(latency, 95),
+            'ttft_p50': percentile(ttft, 50), 'ttft_p95': percentile(ttft, 95),
+        }
+
+    def close(self):
+        self._loop.call_soon_threadsafe(self._loop.stop)
+        self._thread.join(timeout=5)
+
+
+_gateway = None
+_gateway_lock = threading.Lock()
+
+
+def get_gateway():
+    global _gateway
+    with _gateway_lock:
+        if _gateway is None:
+            _gateway = LLMGateway()
+        return _gateway
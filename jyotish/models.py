@@ -0,0 +1,134 @@
+# ========================================
+# JyotishAI – Model Registry
+# One lazy loader for every entry point: nothing is read (or imported)
+# until the first prediction, the format is detected from the file itself,
+# pickled artifacts are loaded with mmap_mode='r' so worker processes share
+# the array pages, and load costs are kept for the sidebar.
+# ========================================
+import os
+import sys
+import threading
+import time
+import warnings
+
+MODELS = {
+    'predictor': "model/jyotish_predictor.npz",
+    'legacy': "model/jyotish_model.pkl",
+}
+
+_ZIP_MAGIC = b'PK\x03\x04'      # np.savez
+_PICKLE_MAGIC = b'\x80'         # pickle protocol 2+ (joblib.dump)
+
+
+class ModelError(ValueError):
+    pass
+
+
+def detect_format(path):
+    with open(path, 'rb') as f:
+        head = f.read(4)
+    if head.startswith(_ZIP_MAGIC):
+        return 'npz'
+    if head.startswith(_PICKLE_MAGIC):
+        return 'joblib'
+    raise ModelError(f"{path}: unknown model format")
+
+
+def _timed_import(name):
+    # (module, seconds spent importing it here; 0 if it was already loaded)
+    if name in sys.modules:
+        return sys.modules[name], 0.0
+    start = time.perf_counter()
+    __import__(name)
+    return sys.modules[name], time.perf_counter() - start
+
+
+def _load_npz(path):
+    module, import_s = _timed_import('jyotish.predictor')
+    try:
+        return module.Predictor.load(path), import_s, None
+    except ValueError as e:
+        raise ModelError(str(e))
+
+
+def _load_joblib(path):
+    joblib, import_s = _timed_import('joblib')
+    # sklearn only warns when unpickling across versions; surface it
+    with warnings.catch_warnings(record=True) as caught:
+        warnings.simplefilter('always')
+        model = joblib.load(path, mmap_mode='r')
+    warning = None
+    for w in caught:
+        trained = getattr(w.message, 'original_sklearn_version', None)
+        if trained is not None:
+            warning = f"trained with scikit-learn {trained}, running {w.message.current_sklearn_version}"
+            break
+    return model, import_s, warning
+
+
+_LOADERS = {'npz': _load_npz, 'joblib': _load_joblib}
+
+
+class ModelRegistry:
+    def __init__(self, paths=None):
+        self.paths = dict(paths or MODELS)
+        self._models = {}
+        self._metrics = {}
+        self._lock = threading.Lock()
+
+    def get(self, name='predictor'):
+        model = self._models.get(name)
+        if model is not None:
+            return model
+        with self._lock:
+            if name not in self._models:
+                self._models[name] = self._load(name)
+            return self._models[name]
+
+    def _load(self, name):
+        path = self.paths.get(name)
+        if path is None:
+            raise ModelError(f"unknown model {name!r}")
+        if not os.path.exists(path):
+            raise ModelError(f"{path}: not found (train it with python -m jyotish.predictor train)")
+        start = time.perf_counter()
+        fmt = detect_format(path)
+        model, import_s, warning = _LOADERS[fmt](path)
+        total = time.perf_counter() - start
+        self._metrics[name] = {
+            'path': path, 'format': fmt, 'bytes': os.path.getsize(path),
+            'import_ms': import_s * 1000, 'load_ms': (total - import_s) * 1000,
+            'warning': warning,
+        }
+        return model
+
+    def loaded(self, name='predictor'):
+        return name in self._models
+
+    def predict(self, lagna, sun, moon, question):
+        return self.get('predictor').predict(lagna, sun, moon, question)
+
+    def stats(self):
+        return {name: dict(self._metrics.get(name, {}), loaded=name in self._models) for name in self.paths}
+
+
+_registry = None
+_registry_lock = threading.Lock()
+
+
+def get_registry():
+    global _registry
+    with _registry_lock:
+        if _registry is None:
+            _registry = ModelRegistry()
+        return _registry
+
+
+def describe(stats):
+    # One-line sidebar summary of a registry entry
+    if not stats.get('loaded'):
+        return "not loaded (loads on first prediction)"
+    text = f"{stats['format']}, {stats['bytes'] / 1024:.0f} KiB, import {stats['import_ms']:.0f} ms + load {stats['load_ms']:.1f} ms"
+    if stats.get('warning'):
+        text += f" – {stats['warning']}"
+    return text
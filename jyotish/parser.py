@@ -0,0 +1,208 @@
+# ========================================
+# JyotishAI – Input Parser
+# Birth date + question from a chat message. Question keywords and date
+# formats are two compiled regexes; every date has a 4-digit year, so the
+# (much larger) date regex only runs on messages that contain one.
+#
+#   python -m jyotish.parser --bench [N]
+# ========================================
+import argparse
+import re
+import time
+from datetime import date
+from functools import lru_cache
+
+QUESTIONS = ['Career?', 'Marriage?', 'Health?', 'Future?']
+
+QUESTION_KEYWORDS = {
+    'career': 'Career?', 'job': 'Career?', 'work': 'Career?',
+    'करियर': 'Career?', 'जागिर': 'Career?', 'काम': 'Career?',
+    'marriage': 'Marriage?', 'wedding': 'Marriage?',
+    'विवाह': 'Marriage?', 'बिहे': 'Marriage?', 'बिहा': 'Marriage?',
+    'health': 'Health?', 'स्वास्थ्य': 'Health?', 'स्वास्थ': 'Health?',
+    'future': 'Future?', 'भविष्य': 'Future?',
+}
+
+EN_MONTHS = {
+    'jan': 1, 'january': 1, 'feb': 2, 'february': 2, 'mar': 3, 'march': 3, 'apr': 4, 'april': 4,
+    'may': 5, 'jun': 6, 'june': 6, 'jul': 7, 'july': 7, 'aug': 8, 'august': 8,
+    'sep': 9, 'sept': 9, 'september': 9, 'oct': 10, 'october': 10, 'nov': 11, 'november': 11,
+    'dec': 12, 'december': 12,
+}
+
+# Bikram Sambat months, Devanagari and common romanizations
+BS_MONTHS = {
+    'बैशाख': 1, 'वैशाख': 1, 'baisakh': 1, 'baishakh': 1,
+    'जेठ': 2, 'जेष्ठ': 2, 'jestha': 2, 'jeth': 2,
+    'असार': 3, 'आषाढ': 3, 'asar': 3, 'ashadh': 3, 'asadh': 3,
+    'साउन': 4, 'श्रावण': 4, 'shrawan': 4, 'saun': 4,
+    'भदौ': 5, 'भाद्र': 5, 'bhadra': 5, 'bhadau': 5,
+    'असोज': 6, 'आश्विन': 6, 'ashwin': 6, 'asoj': 6,
+    'कात्तिक': 7, 'कार्तिक': 7, 'kartik': 7,
+    'मंसिर': 8, 'मङ्सिर': 8, 'mangsir': 8,
+    'पुस': 9, 'पौष': 9, 'poush': 9, 'push': 9,
+    'माघ': 10, 'magh': 10,
+    'फागुन': 11, 'फाल्गुन': 11, 'falgun': 11, 'phagun': 11,
+    'चैत': 12, 'चैत्र': 12, 'chaitra': 12, 'chait': 12,
+}
+
+_DEV = 'ऀ-ॣ०-ॿ'          # Devanagari letters, signs and digits; not the dandas
+# Case endings written joined to a Nepali keyword (करियरको, बिहेमा, कामले);
+# any other letter after it means a different word (बिहान, कामना)
+NE_SUFFIXES = ['को', 'का', 'की', 'मा', 'ले', 'लाई', 'बाट', 'बारे', 'सँग', 'संग', 'देखि', 'नै', 'मै', 'हरू', 'हरु']
+
+
+def _alternation(words):
+    # Longest first so "september" wins over "sep"
+    return '|'.join(re.escape(w) for w in sorted(words, key=len, reverse=True))
+
+
+def _compile():
+    latin_q = [w for w in QUESTION_KEYWORDS if w.isascii()]
+    dev_q = [w for w in QUESTION_KEYWORDS if not w.isascii()]
+    months = _alternation(list(EN_MONTHS) + list(BS_MONTHS))
+    bs_mark = r'(?:b\.?\s?s\.?(?![a-z])|[वब]ि\.?\s?सं\.?)'
+    # Every match starts at a token boundary; checking that once up front
+    # makes the scan skip the middle of words after a single lookbehind.
+    boundary = rf'(?<![a-z\d{_DEV}])'
+    dates = re.compile(
+        rf'{boundary}'
+        rf'(?P<bs_pre>{bs_mark}\s*)?'
+        rf'(?:(?P<iy>\d{{4}})[-/.](?P<im>\d{{1,2}})[-/.](?P<id>\d{{1,2}})(?!\d)'
+        rf'|(?P<dd>\d{{1,2}})[-/.](?P<dm>\d{{1,2}})[-/.](?P<dy>\d{{4}})(?!\d)'
+        rf'|(?P<nd>\d{{1,2}})(?:st|nd|rd|th)?\s+(?P<nm>{months})\.?,?\s+(?P<ny>\d{{4}})(?!\d)'
+        rf'|(?P<mm>{months})\.?\s+(?P<md>\d{{1,2}})(?:st|nd|rd|th)?,?\s+(?P<my>\d{{4}})(?!\d)'
+        rf'|(?P<yy>\d{{4}})\s+(?P<ym>{months})\.?,?\s+(?P<yd>\d{{1,2}})(?!\d))'
+        rf'(?P<bs_post>\s*{bs_mark})?'
+    )
+    questions = re.compile(
+        rf'{boundary}(?:(?P<q_en>{_alternation(latin_q)})s?(?![a-z])'
+        rf'|(?P<q_ne>{_alternation(dev_q)})(?:{_alternation(NE_SUFFIXES)})?(?![{_DEV}]))'
+    )
+    return dates, questions
+
+
+# \d also matches Devanagari digits and int() reads them, so २०६१ needs no translation
+_DATES, _QUESTIONS = _compile()
+_GROUPS = sorted(_DATES.groupindex, key=_DATES.groupindex.get)
+_YEAR = re.compile(r'\d{4}')
+
+# ========================================
+# DATES
+# ========================================
+def bs_to_ad(year, month, day):
+    # Month lengths of the Nepali calendar aren't computable from a formula;
+    # nepali-datetime ships the official table.
+    try:
+        import nepali_datetime
+    except ImportError:
+        return None
+    try:
+        return nepali_datetime.date(year, month, day).to_datetime_date()
+    except (ValueError, OverflowError):
+        return None
+
+
+@lru_cache(maxsize=65536)
+def _resolve_date(groups, this_year):
+    # Cached on the raw match groups: chat logs repeat the same dates a lot
+    g = dict(zip(_GROUPS, groups))
+    if g['iy']:
+        y, mo, d = int(g['iy']), int(g['im']), int(g['id'])
+    elif g['dy']:
+        y, mo, d = int(g['dy']), int(g['dm']), int(g['dd'])
+    else:
+        name = g['nm'] or g['mm'] or g['ym']
+        y, d = int(g['ny'] or g['my'] or g['yy']), int(g['nd'] or g['md'] or g['yd'])
+        if name in BS_MONTHS:
+            return bs_to_ad(y, BS_MONTHS[name], d)
+        mo = EN_MONTHS[name]
+    # BS years run ~57 years ahead, so a "future" year is a BS year
+    if g['bs_pre'] or g['bs_post'] or y > this_year + 1:
+        return bs_to_ad(y, mo, d)
+    try:
+        return date(y, mo, d)
+    except ValueError:
+        return None
+
+# ========================================
+# PUBLIC API
+# ========================================
+def _parse(text, this_year):
+    # text: lowercased
+    question = None
+    m = _QUESTIONS.search(text)
+    if m:
+        question = QUESTION_KEYWORDS[m.group(m.lastgroup)]
+    if _YEAR.search(text):
+        for m in _DATES.finditer(text):
+            resolved = _resolve_date(m.groups(), this_year)
+            if resolved is not None:
+                return resolved.isoformat(), question
+    return None, question
+
+
+def parse(text, today=None):
+    # (ISO birth date or None, canonical question or None)
+    return _parse(text.lower(), (today or date.today()).year)
+
+
+def parse_many(texts, today=None):
+    # parse() over a batch, with today's year looked up once
+    this_year = (today or date.today()).year
+    return [_parse(t.lower(), this_year) for t in texts]
+
+# ========================================
+# MICRO-BENCHMARK
+# ========================================
+def _legacy_extract(text):
+    # extract_input as it was in chatbot.py, kept as the benchmark baseline
+    date_match = re.search(r'\d{4}-\d{2}-\d{2}', text)
+    birth_date = date_match.group() if date_match else None
+    q_map = {
+        'career': 'Career?', 'करियर': 'Career?', 'job': 'Career?',
+        'marriage': 'Marriage?', 'विवाह': 'Marriage?', 'बिहे': 'Marriage?',
+        'health': 'Health?', 'स्वास्थ्य': 'Health?',
+        'future': 'Future?', 'भविष्य': 'Future?'
+    }
+    text_lower = text.lower()
+    question = next((q_map[w] for w in text_lower.split() if w in q_map), None)
+    return birth_date, question
+
+
+def _sample_messages(n):
+    samples = [
+        "2004-06-11, career?", "hi", "how are you", "11/06/2004 marriage",
+        "June 11, 2004 - what about my health?", "२०६१-०२-२८ करियर?",
+        "वि.सं. २०६१ जेठ २८, विवाह कहिले होला?", "tell me about my future, born 1998-06-12",
+        "मेरो स्वास्थ्य कस्तो छ? जन्म 1995-11-05", "what is the weather today",
+    ]
+    return [samples[i % len(samples)] for i in range(n)]
+
+
+def bench(n=100000):
+    messages = _sample_messages(n)
+    timings = {}
+    for name, fn in [('legacy extract_input', lambda: [_legacy_extract(t) for t in messages]),
+                     ('parse (per message)', lambda: [parse(t) for t in messages]),
+                     ('parse_many (batch)', lambda: parse_many(messages))]:
+        start = time.perf_counter()
+        fn()
+        timings[name] = time.perf_counter() - start
+        print(f"{name:22s} {timings[name]:.3f}s  {n / timings[name]:,.0f} msg/s")
+    return timings
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="JyotishAI input parser")
+    parser.add_argument("--bench", type=int, nargs="?", const=100000, help="benchmark on N messages")
+    parser.add_argument("text", nargs="*")
+    args = parser.parse_args(argv)
+    if args.bench:
+        bench(args.bench)
+    for text in args.text:
+        print(text, "->", parse(text))
+
+
+if __name__ == "__main__":
+    main()
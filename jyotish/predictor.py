@@ -0,0 +1,187 @@
+# ========================================
+# JyotishAI – Fast Predictor
+# The model input is four categorical fields (lagna, sun, moon, question),
+# so instead of TF-IDF over "Leo Gemini Leo Marriage?" this is a naive Bayes
+# over the codes directly, folded at train time into a lookup table over
+# every input combination. Prediction is an array index; the artifact is a
+# small .npz that loads without pickle.
+#
+#   python -m jyotish.predictor train [--data data/clean/kundali.arrow]
+#   python -m jyotish.predictor bench [--n 100000]
+# ========================================
+import argparse
+import os
+import time
+
+import numpy as np
+
+from jyotish.chart import SIGNS
+
+FEATURES = ['lagna', 'sun', 'moon', 'question']
+DEFAULT_PATH = "model/jyotish_predictor.npz"
+LEGACY_PATH = "model/jyotish_model.pkl"
+FORMAT_VERSION = 1
+ALPHA = 1.0     # Laplace smoothing, as MultinomialNB's default
+
+
+class Predictor:
+    # table[lagna, sun, moon, question] -> class index. Each axis has one
+    # extra trailing slot for values not seen at train time, whose feature
+    # is then left out of the vote.
+    def __init__(self, table, classes, questions):
+        self.table = table
+        self.classes = classes
+        self.questions = list(questions)
+        self.vocab = [{v: i for i, v in enumerate(SIGNS)}] * 3 + [{v: i for i, v in enumerate(self.questions)}]
+
+    def _codes(self, values, vocab):
+        if hasattr(values, 'cat'):
+            # Categorical column: remap its categories once, not every row
+            lookup = np.array([vocab.get(v, len(vocab)) for v in values.cat.categories] + [len(vocab)])
+            return lookup[np.asarray(values.cat.codes)]     # code -1 (NaN) hits the last slot
+        unknown = len(vocab)
+        return np.fromiter((vocab.get(v, unknown) for v in values), dtype=np.intp)
+
+    def predict_codes(self, columns):
+        # Class indices for a DataFrame / dict of equal-length columns
+        idx = tuple(self._codes(columns[f], vocab) for f, vocab in zip(FEATURES, self.vocab))
+        return self.table[idx]
+
+    def predict_batch(self, columns):
+        return self.classes[self.predict_codes(columns)]
+
+    def predict(self, lagna, sun, moon, question):
+        idx = tuple(vocab.get(v, len(vocab)) for v, vocab in zip((lagna, sun, moon, question), self.vocab))
+        return str(self.classes[self.table[idx]])
+
+    def save(self, path=DEFAULT_PATH):
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        np.savez(path, version=np.int32(FORMAT_VERSION), table=self.table,
+                 classes=self.classes, questions=np.array(self.questions))
+
+    @classmethod
+    def load(cls, path=DEFAULT_PATH):
+        with np.load(path, allow_pickle=False) as data:
+            if int(data['version']) != FORMAT_VERSION:
+                raise ValueError(f"{path}: predictor format {int(data['version'])}, expected {FORMAT_VERSION}")
+            return cls(data['table'], data['classes'], data['questions'].tolist())
+
+# ========================================
+# TRAINING
+# ========================================
+def _feature_codes(df, questions):
+    vocabs = [{v: i for i, v in enumerate(SIGNS)}] * 3 + [{v: i for i, v in enumerate(questions)}]
+    return [np.array([vocab.get(v, -1) for v in df[f]]) for f, vocab in zip(FEATURES, vocabs)]
+
+
+def train(df, alpha=ALPHA):
+    questions = sorted(set(df['question']))
+    classes, y = np.unique(np.asarray(df['prediction'], dtype=str), return_inverse=True)
+    n_classes = len(classes)
+    sizes = [len(SIGNS)] * 3 + [len(questions)]
+
+    class_count = np.bincount(y, minlength=n_classes)
+    scores = np.log(class_count / class_count.sum())
+    # Broadcast prior + per-feature log-likelihoods over the full input grid
+    shape = [s + 1 for s in sizes]
+    joint = np.broadcast_to(scores, shape + [n_classes]).copy()
+    for axis, (codes, size) in enumerate(zip(_feature_codes(df, questions), sizes)):
+        seen = codes >= 0
+        counts = np.zeros((size, n_classes))
+        np.add.at(counts, (codes[seen], y[seen]), 1)
+        loglik = np.log((counts + alpha) / (counts.sum(axis=0) + alpha * size))
+        loglik = np.vstack([loglik, np.zeros(n_classes)])    # unknown slot: no vote
+        view = [1] * len(shape) + [n_classes]
+        view[axis] = size + 1
+        joint += loglik.reshape(view)
+
+    dtype = np.int8 if n_classes <= 127 else np.int16
+    table = joint.argmax(axis=-1).astype(dtype)
+    return Predictor(table, classes, questions)
+
+
+def load_training_data(path):
+    if path.endswith('.csv'):
+        import pandas as pd
+        return pd.read_csv(path)
+    from jyotish.dataset import load_cases
+    return load_cases(path)
+
+# ========================================
+# BENCHMARK
+# ========================================
+def _legacy_text(columns, i):
+    return f"{columns['lagna'][i]} {columns['sun'][i]} {columns['moon'][i]} {columns['question'][i]}"
+
+
+def bench(df, n=100000, path=DEFAULT_PATH, legacy_path=LEGACY_PATH):
+    import joblib
+    rng = np.random.default_rng(0)
+    questions = sorted(set(df['question']))
+    batch = {f: [SIGNS[i] for i in rng.integers(0, 12, n)] for f in FEATURES[:3]}
+    batch['question'] = [questions[i] for i in rng.integers(0, len(questions), n)]
+    texts = [_legacy_text(batch, i) for i in range(n)]
+
+    rows = []
+
+    def timed(fn, repeat=1):
+        start = time.perf_counter()
+        for _ in range(repeat):
+            out = fn()
+        return (time.perf_counter() - start) / repeat, out
+
+    load_old, legacy = timed(lambda: joblib.load(legacy_path), 5)
+    load_new, fast = timed(lambda: Predictor.load(path), 5)
+    one_old, _ = timed(lambda: legacy.predict([texts[0]]), 200)
+    one_new, _ = timed(lambda: fast.predict(*(batch[f][0] for f in FEATURES)), 200)
+    many_old, pred_old = timed(lambda: legacy.predict(texts))
+    many_new, pred_new = timed(lambda: fast.predict_batch(batch))
+
+    rows.append(('artifact size', f"{os.path.getsize(legacy_path) / 1024:.1f} KiB", f"{os.path.getsize(path) / 1024:.1f} KiB"))
+    rows.append(('load', f"{load_old * 1000:.2f} ms", f"{load_new * 1000:.2f} ms"))
+    rows.append(('single predict', f"{one_old * 1e6:.0f} us", f"{one_new * 1e6:.1f} us"))
+    rows.append((f'batch of {n:,}', f"{n / many_old:,.0f} /s", f"{n / many_new:,.0f} /s"))
+    print(f"{'':18s} {'tfidf+NB (pkl)':>18s} {'predictor (npz)':>18s}")
+    for name, old, new in rows:
+        print(f"{name:18s} {old:>18s} {new:>18s}")
+    agree = np.mean(np.asarray(pred_old) == pred_new)
+    print(f"agreement with the legacy model: {agree * 100:.1f}%")
+    return {'load': (load_old, load_new), 'single': (one_old, one_new), 'batch': (many_old, many_new)}
+
+
+def holdout_accuracy(df, test_size=0.2, seed=42):
+    # Same split as Train_Model_Visualize.ipynb
+    from sklearn.model_selection import train_test_split
+    train_df, test_df = train_test_split(df, test_size=test_size, random_state=seed)
+    model = train(train_df)
+    pred = model.predict_batch(test_df)
+    return float(np.mean(pred == np.asarray(test_df['prediction'], dtype=str)))
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="JyotishAI fast predictor")
+    sub = parser.add_subparsers(dest="cmd", required=True)
+    tr = sub.add_parser("train", help="fit on the case dataset and save the artifact")
+    tr.add_argument("--data", default="data/clean/kundali.arrow", help=".arrow/.parquet or a clean CSV")
+    tr.add_argument("--out", default=DEFAULT_PATH)
+    be = sub.add_parser("bench", help="compare against the TF-IDF pipeline")
+    be.add_argument("--data", default="data/clean/kundali.arrow")
+    be.add_argument("--n", type=int, default=100000)
+    be.add_argument("--model", default=DEFAULT_PATH)
+    be.add_argument("--legacy", default=LEGACY_PATH)
+    args = parser.parse_args(argv)
+
+    df = load_training_data(args.data)
+    if args.cmd == "train":
+        print(f"hold-out accuracy: {holdout_accuracy(df) * 100:.2f}%")
+        start = time.perf_counter()
+        model = train(df)
+        model.save(args.out)
+        print(f"trained on {len(df)} rows in {(time.perf_counter() - start) * 1000:.1f} ms, "
+              f"{len(model.classes)} classes -> {args.out}")
+    else:
+        bench(df, args.n, args.model, args.legacy)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,43 @@
+# ========================================
+# JyotishAI – Prompt templates
+# Shared by the chat apps and the offline pre-warm job so both send
+# byte-identical prompts to Ollama.
+# ========================================
+from jyotish.signs import SIGNS
+from jyotish.parser import QUESTIONS
+
+LANGS = ["English", "नेपाली"]
+
+
+def astrology_prompt(lagna, sun, moon, question, lang):
+    return f"""
+    You are JyotishAI. Lagna={lagna}, Sun={sun}, Moon={moon}.
+    Question: {question}
+    Answer in **{lang} only**. 3 sentences. End with a Vedic remedy.
+    """
+
+
+def astrology_fallback(lang):
+    return "Try again." if lang == "English" else "पछि प्रयास गर्नुहोस्।"
+
+
+def general_prompt(prompt, lang, context=None):
+    # context: trimmed earlier turns (jyotish.history.Conversation.context)
+    if not context:
+        return f"Reply in **{lang} only**, short and natural: {prompt}"
+    turns = "\n".join(f"{'User' if m['role'] == 'user' else 'JyotishAI'}: {m['content']}" for m in context)
+    return f"Conversation so far:\n{turns}\n\nReply in **{lang} only**, short and natural: {prompt}"
+
+
+def general_fallback(lang):
+    return "I'm here!" if lang == "English" else "म यहाँ छु!"
+
+
+def astrology_keys():
+    # Whole (lagna, sun, moon, question, lang) space the prompt depends on
+    for lang in LANGS:
+        for question in QUESTIONS:
+            for lagna in SIGNS:
+                for sun in SIGNS:
+                    for moon in SIGNS:
+                        yield (lagna, sun, moon, question, lang)
@@ -0,0 +1,187 @@
+# ========================================
+# JyotishAI – Astrology Response Cache
+# The astrology prompt only depends on (lagna, sun, moon, question, lang),
+# so answers are cached per tuple in SQLite. Each key collects up to
+# `variants` distinct answers before it is served purely from cache, so
+# repeat users don't get the same text verbatim every time.
+#
+#   python -m jyotish.response_cache --prewarm      # fill the whole key space
+#   python -m jyotish.response_cache --stats
+# ========================================
+import argparse
+import os
+import random
+import sqlite3
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from jyotish.llm import stream_chat
+from jyotish.prompts import astrology_fallback, astrology_keys, astrology_prompt
+
+DEFAULT_PATH = "data/cache/responses.sqlite"
+VARIANTS = 3
+TTL = 30 * 24 * 3600        # seconds; 0 disables expiry
+MAX_KEYS = 20000            # > 12*12*12*4*2, so a full pre-warm fits
+
+
+def normalize_key(lagna, sun, moon, question, lang):
+    return "|".join(str(part).strip() for part in (lagna, sun, moon, question, lang))
+
+
+class ResponseCache:
+    def __init__(self, path=DEFAULT_PATH, variants=VARIANTS, ttl=TTL, max_keys=MAX_KEYS):
+        self.path = path
+        self.variants = variants
+        self.ttl = ttl
+        self.max_keys = max_keys
+        self.hits = self.misses = self.evictions = 0
+        self._lock = threading.Lock()
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        self._db = sqlite3.connect(path, check_same_thread=False)
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.execute(
+            "CREATE TABLE IF NOT EXISTS responses ("
+            " key TEXT NOT NULL, text TEXT NOT NULL, created REAL NOT NULL, last_used REAL NOT NULL,"
+            " PRIMARY KEY (key, text))"
+        )
+        self._db.execute("CREATE INDEX IF NOT EXISTS responses_last_used ON responses (last_used)")
+        self._db.commit()
+
+    def _fresh_after(self, now):
+        return now - self.ttl if self.ttl else 0.0
+
+    def variants_for(self, key):
+        with self._lock:
+            rows = self._db.execute(
+                "SELECT text FROM responses WHERE key = ? AND created >= ?",
+                (key, self._fresh_after(time.time())),
+            ).fetchall()
+        return [r[0] for r in rows]
+
+    def get(self, key):
+        # A hit only once the key has collected all its variants
+        now = time.time()
+        with self._lock:
+            rows = self._db.execute(
+                "SELECT text FROM responses WHERE key = ? AND created >= ?", (key, self._fresh_after(now))
+            ).fetchall()
+            if len(rows) < self.variants:
+                self.misses += 1
+                return None
+            text = random.choice(rows)[0]
+            self._db.execute("UPDATE responses SET last_used = ? WHERE key = ?", (now, key))
+            self._db.commit()
+            self.hits += 1
+            return text
+
+    def add(self, key, text):
+        text = text.strip()
+        if not text:
+            return
+        now = time.time()
+        with self._lock:
+            self._db.execute("DELETE FROM responses WHERE key = ? AND created < ?", (key, self._fresh_after(now)))
+            self._db.execute("INSERT OR IGNORE INTO responses VALUES (?, ?, ?, ?)", (key, text, now, now))
+            self._evict()
+            self._db.commit()
+
+    def _evict(self):
+        over = self._db.execute("SELECT COUNT(DISTINCT key) FROM responses").fetchone()[0] - self.max_keys
+        if over > 0:
+            self._db.execute(
+                "DELETE FROM responses WHERE key IN ("
+                " SELECT key FROM responses GROUP BY key ORDER BY MAX(last_used) LIMIT ?)", (over,)
+            )
+            self.evictions += over
+
+    def purge_expired(self):
+        with self._lock:
+            self._db.execute("DELETE FROM responses WHERE created < ?", (self._fresh_after(time.time()),))
+            self._db.commit()
+
+    def stats(self):
+        with self._lock:
+            keys, rows = self._db.execute("SELECT COUNT(DISTINCT key), COUNT(*) FROM responses").fetchone()
+        return {'keys': keys, 'responses': rows, 'hits': self.hits, 'misses': self.misses, 'evictions': self.evictions}
+
+    def close(self):
+        self._db.close()
+
+
+def cached_astrology(cache, lagna, sun, moon, question, lang, offline=None, status=None):
+    # Token iterator: a cached answer in one piece, or a live stream that is
+    # stored as a new variant once it completes. When Ollama is unavailable
+    # the answer comes from offline(lagna, sun, moon, question) if given,
+    # else the fixed fallback; neither is cached, nor is a stream cut off
+    # mid-answer. status (a dict) gets 'complete' as in stream_chat.
+    status = {} if status is None else status
+    key = normalize_key(lagna, sun, moon, question, lang)
+    text = cache.get(key)
+    if text is not None:
+        status['complete'] = True
+        yield text
+        return
+
+    def fallback():
+        answer = offline(lagna, sun, moon, question) if offline else None
+        return answer or astrology_fallback(lang)
+
+    parts = []
+    for token in stream_chat(astrology_prompt(lagna, sun, moon, question, lang), fallback, status=status):
+        parts.append(token)
+        yield token
+    if status['complete']:
+        cache.add(key, "".join(parts))
+
+# ========================================
+# OFFLINE PRE-WARM
+# ========================================
+def prewarm(cache, workers=4, limit=None, log_every=100):
+    keys = list(astrology_keys())[:limit]
+    done = [0]
+    start = time.perf_counter()
+    lock = threading.Lock()
+
+    def fill(parts):
+        # Variants of one key are generated one after another: the gateway
+        # would coalesce identical prompts sent concurrently.
+        key = normalize_key(*parts)
+        for _ in range(cache.variants - len(cache.variants_for(key))):
+            status = {}
+            answer = "".join(stream_chat(astrology_prompt(*parts), astrology_fallback(parts[-1]), status=status))
+            if not status['complete']:
+                break
+            cache.add(key, answer)
+        with lock:
+            done[0] += 1
+            if done[0] % log_every == 0 or done[0] == len(keys):
+                rate = done[0] / (time.perf_counter() - start)
+                print(f"{done[0]}/{len(keys)} keys ({rate:.1f} keys/s)", flush=True)
+
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        list(pool.map(fill, keys))
+    return cache.stats()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="JyotishAI astrology response cache")
+    parser.add_argument("--path", default=DEFAULT_PATH)
+    parser.add_argument("--variants", type=int, default=VARIANTS)
+    parser.add_argument("--prewarm", action="store_true", help="generate answers for every key")
+    parser.add_argument("--workers", type=int, default=4)
+    parser.add_argument("--limit", type=int, default=None, help="only pre-warm the first N keys")
+    parser.add_argument("--purge", action="store_true", help="drop expired answers")
+    parser.add_argument("--stats", action="store_true")
+    args = parser.parse_args(argv)
+
+    cache = ResponseCache(args.path, variants=args.variants)
+    if args.purge:
+        cache.purge_expired()
+    if args.prewarm:
+        prewarm(cache, workers=args.workers, limit=args.limit)
+    print(cache.stats())
+
+
+if __name__ == "__main__":
+    main()
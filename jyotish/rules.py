@@ -0,0 +1,172 @@
+# ========================================
+# JyotishAI – Rule Engine
+# data/rules/jyotish_rules.json compiled into a dense graha × house ×
+# question array of rule ids (whole-sign houses counted from the lagna).
+# One fancy-indexing pass evaluates all nine placements of any number of
+# charts; strings are interned once at compile time. The file is only
+# recompiled when its mtime changes.
+# ========================================
+import json
+import os
+import threading
+
+from jyotish.signs import COLUMNS, GRAHAS, SIGNS
+
+DEFAULT_PATH = "data/rules/jyotish_rules.json"
+
+# Houses each question is read from; a rule may override with "questions"
+QUESTION_HOUSES = {
+    'career': {2, 6, 10, 11},
+    'marriage': {2, 4, 7},
+    'health': {1, 6, 8},
+    'future': {1, 5, 9, 11},
+}
+QUESTION_KEYS = list(QUESTION_HOUSES)
+ANY = len(QUESTION_KEYS)        # question slot that matches every rule
+
+DEFAULT_REMEDY = {'English': "Do regular puja.", 'नेपाली': "नियमित पूजा गर्नुहोस्।"}
+
+_SIGN_CODES = {s: i for i, s in enumerate(SIGNS)}
+
+
+class RuleError(ValueError):
+    pass
+
+
+def question_code(question):
+    # 'Career?', 'career' -> slot; anything else -> ANY
+    key = (question or '').rstrip('?').strip().lower()
+    return QUESTION_KEYS.index(key) if key in QUESTION_HOUSES else ANY
+
+
+def ordinal(n):
+    return f"{n}{'th' if 10 <= n % 100 <= 20 else {1: 'st', 2: 'nd', 3: 'rd'}.get(n % 10, 'th')}"
+
+
+class RuleEngine:
+    def __init__(self, records):
+        strings = {}                                    # interned text -> id
+
+        def intern(text):
+            return strings.setdefault(text, len(strings))
+
+        graha_index = {g: i for i, g in enumerate(GRAHAS)}
+        # (graha, house) -> compiled entry; several records for one placement merge
+        merged = {}
+        for n, rec in enumerate(records):
+            try:
+                graha = graha_index[rec['planet'].strip().lower()]
+                house = int(rec['house'])
+                effect, remedy = rec['effect'].strip(), rec['remedy'].strip()
+            except (KeyError, AttributeError, TypeError, ValueError):
+                raise RuleError(f"rule {n}: needs planet (one of {GRAHAS}), house, effect, remedy")
+            if not 1 <= house <= 12:
+                raise RuleError(f"rule {n}: house {house} is not 1-12")
+            questions = rec.get('questions')
+            if questions is None:
+                slots = [i for i, q in enumerate(QUESTION_KEYS) if house in QUESTION_HOUSES[q]]
+            else:
+                slots = [question_code(q) for q in questions]
+            entry = merged.setdefault((graha, house), {'effects': [], 'remedies': {}, 'slots': set()})
+            entry['effects'].append((effect, rec.get('effect_ne', effect).strip()))
+            for lang, text in (('English', remedy), ('नेपाली', rec.get('remedy_ne', remedy).strip())):
+                entry['remedies'].setdefault(lang, text)
+            entry['slots'].update(s for s in slots if s != ANY)
+
+        import numpy as np      # on the first compile, not when core is imported
+        n_rules = len(merged)
+        self.table = np.full((len(GRAHAS), 12, len(QUESTION_KEYS) + 1), -1, dtype=np.int16)
+        self.graha = np.empty(n_rules, dtype=np.int8)
+        self.house = np.empty(n_rules, dtype=np.int8)
+        # Per rule and language: interned string ids
+        self.effect = {'English': np.empty(n_rules, dtype=np.int32), 'नेपाली': np.empty(n_rules, dtype=np.int32)}
+        self.remedy = {'English': np.empty(n_rules, dtype=np.int32), 'नेपाली': np.empty(n_rules, dtype=np.int32)}
+        for rule_id, ((graha, house), entry) in enumerate(sorted(merged.items())):
+            self.graha[rule_id], self.house[rule_id] = graha, house
+            for i, lang in enumerate(('English', 'नेपाली')):
+                self.effect[lang][rule_id] = intern("; ".join(e[i] for e in entry['effects']))
+                self.remedy[lang][rule_id] = intern(entry['remedies'][lang])
+            for slot in entry['slots']:
+                self.table[graha, house - 1, slot] = rule_id
+            self.table[graha, house - 1, ANY] = rule_id
+        self.strings = np.array(list(strings), dtype=object)
+        self.size = n_rules
+
+    # ---------- evaluation ----------
+    def evaluate(self, codes, questions):
+        # codes: (n, 10) sign codes in COLUMNS order (lagna first)
+        # questions: (n,) question slots -> (n, 9) rule ids, -1 where none fires
+        import numpy as np
+        codes = np.asarray(codes, dtype=np.int16)
+        houses = (codes[:, 1:] - codes[:, :1]) % 12
+        return self.table[np.arange(len(GRAHAS)), houses, np.asarray(questions)[:, None]]
+
+    def evaluate_charts(self, charts, questions):
+        # charts: dicts of English sign names (jyotish.chart / ChartCache)
+        codes = [[_SIGN_CODES[c[col]] for col in COLUMNS] for c in charts]
+        slots = [question_code(q) for q in questions]
+        import numpy as np
+        return self.evaluate(np.array(codes).reshape(-1, len(COLUMNS)), np.array(slots, dtype=np.intp))
+
+    def describe(self, rule_ids, lang="English"):
+        # {'effects': [...], 'remedy': str} for one chart's row of rule ids
+        lang = lang if lang in self.effect else "English"
+        fired = [int(r) for r in rule_ids if r >= 0]
+        effects = [
+            f"{GRAHAS[self.graha[r]].capitalize()} in {ordinal(int(self.house[r]))}: {self.strings[self.effect[lang][r]]}"
+            for r in fired
+        ]
+        remedy = self.strings[self.remedy[lang][fired[0]]] if fired else DEFAULT_REMEDY[lang]
+        return {'effects': effects, 'remedy': remedy}
+
+    def answers(self, charts, questions, lang="English"):
+        return [self.describe(row, lang) for row in self.evaluate_charts(charts, questions)]
+
+# ========================================
+# LOADING (mtime-checked)
+# ========================================
+def load_rules(path=DEFAULT_PATH):
+    with open(path, encoding='utf-8') as f:
+        records = json.load(f)
+    if not isinstance(records, list):
+        raise RuleError(f"{path}: expected a list of rules")
+    return RuleEngine(records)
+
+
+class RuleBook:
+    # Holds the compiled engine; get() recompiles only after the file changed.
+    # A broken edit keeps the last good engine and is reported in .error.
+    def __init__(self, path=DEFAULT_PATH):
+        self.path = path
+        self.reloads = 0
+        self.error = None
+        self._mtime = None
+        self._engine = None
+        self._lock = threading.Lock()
+
+    def get(self):
+        mtime = os.stat(self.path).st_mtime_ns
+        if mtime != self._mtime:
+            with self._lock:
+                if mtime != self._mtime:
+                    try:
+                        self._engine = load_rules(self.path)
+                        self.error = None
+                        self.reloads += 1
+                    except (OSError, ValueError) as e:
+                        if self._engine is None:
+                            raise
+                        self.error = str(e)
+                    self._mtime = mtime
+        return self._engine
+
+
+_books = {}
+_books_lock = threading.Lock()
+
+
+def get_rulebook(path=DEFAULT_PATH):
+    with _books_lock:
+        if path not in _books:
+            _books[path] = RuleBook(path)
+        return _books[path]
@@ -0,0 +1,351 @@
+# ========================================
+# JyotishAI – HTTP Service
+# Headless aiohttp front for jyotish.core, so prediction workers scale
+# separately from the Streamlit UI servers. Workers share one port via
+# SO_REUSEPORT and can sit behind any load balancer.
+#
+#   python -m jyotish.service --port 8600 --workers 4
+#
+#   GET  /health
+#   GET  /metrics           Prometheus text: stage histograms + cache/LLM gauges
+#                           (all workers: histograms summed, gauges per pid)
+#   GET  /v1/metrics
+#   GET  /v1/traces        ?min_ms=&trace_id=   recent traces with their spans
+#   POST /v1/charts        {"births": [{"birth_date", "birth_time"?, "place"?}, ...]}
+#   POST /v1/predictions   {"items": [{"lagna", "sun", "moon", "question"}, ...]}
+#   POST /v1/rules         {"items": [{"birth_date", "question", ...}, ...], "lang"?}
+#   POST /v1/parse         {"texts": [...]}
+#   POST /v1/chat          {"message", "lang", "context"?}  -> text/plain token stream
+#   POST /v1/tts           {"text", "lang"}     -> audio bytes
+#
+# Every request runs in a trace; clients pass their session id as
+# X-Trace-Id (echoed back) so a session's turns can be found together.
+# ========================================
+import argparse
+import asyncio
+import glob
+import json
+import multiprocessing
+import os
+import shutil
+import tempfile
+from concurrent.futures import ThreadPoolExecutor
+
+from aiohttp import web
+
+from jyotish import core
+from jyotish.parser import parse_many
+from jyotish.prompts import LANGS
+from jyotish.tracing import Tracer, current_trace, flatten_gauges, get_tracer, in_context, span, trace
+
+DEFAULT_HOST = "127.0.0.1"
+DEFAULT_PORT = 8600
+TRACE_HEADER = "X-Trace-Id"
+MAX_BATCH = 10000
+STREAM_THREADS = 32     # chat streams blocked on the LLM gateway at once
+METRICS_EVERY = 5.0     # seconds between metric snapshots of each worker
+_DONE = object()
+
+_executor = ThreadPoolExecutor(max_workers=STREAM_THREADS, thread_name_prefix="service")
+
+
+async def _in_thread(fn, *args):
+    return await asyncio.get_running_loop().run_in_executor(_executor, in_context(fn), *args)
+
+
+async def _iterate_in_thread(gen):
+    # Drives a blocking token generator on the executor; closing the async
+    # iterator early (client went away) closes the generator too
+    loop = asyncio.get_running_loop()
+    out = asyncio.Queue()
+    stop = [False]
+
+    def drive():
+        try:
+            for item in gen:
+                loop.call_soon_threadsafe(out.put_nowait, item)
+                if stop[0]:
+                    break
+        except Exception as e:
+            loop.call_soon_threadsafe(out.put_nowait, e)
+        finally:
+            gen.close()
+            loop.call_soon_threadsafe(out.put_nowait, _DONE)
+
+    loop.run_in_executor(_executor, in_context(drive))
+    try:
+        while True:
+            item = await out.get()
+            if item is _DONE:
+                return
+            if isinstance(item, Exception):
+                raise item
+            yield item
+    finally:
+        stop[0] = True
+
+
+async def _json_list(request, field):
+    try:
+        body = await request.json()
+        items = body[field]
+    except Exception:
+        raise web.HTTPBadRequest(text=f'expected a JSON object with a "{field}" list')
+    if not isinstance(items, list):
+        raise web.HTTPBadRequest(text=f'"{field}" must be a list')
+    if len(items) > MAX_BATCH:
+        raise web.HTTPRequestEntityTooLarge(max_size=MAX_BATCH, actual_size=len(items))
+    return items
+
+
+def _lang(value):
+    if value not in LANGS:
+        raise web.HTTPBadRequest(text=f"lang must be one of {LANGS}")
+    return value
+
+@web.middleware
+async def tracing_middleware(request, handler):
+    route = request.match_info.route.resource
+    name = route.canonical if route is not None else "unmatched"
+    trace_id = request.headers.get(TRACE_HEADER, '')[:64] or None
+    with trace(trace_id) as trace_id, span(f"http {request.method} {name}"):
+        try:
+            response = await handler(request)
+        except web.HTTPException as e:
+            e.headers[TRACE_HEADER] = trace_id
+            raise
+    # Streams were sent inside the handler (see _trace_header)
+    if not response.prepared:
+        response.headers[TRACE_HEADER] = trace_id
+    return response
+
+
+async def _trace_header(request, response):
+    # For streams, which send their headers inside the handler's context
+    trace_id = current_trace()
+    if trace_id:
+        response.headers[TRACE_HEADER] = trace_id
+
+# ========================================
+# HANDLERS
+# ========================================
+async def health(request):
+    return web.json_response({'ok': True, 'pid': os.getpid()})
+
+
+async def metrics(request):
+    return web.json_response(await _in_thread(core.metrics))
+
+
+def _gauges():
+    stats = core.metrics()
+    stats.pop('stages')     # exported as histograms
+    return flatten_gauges(stats)
+
+
+def _write_snapshot(directory):
+    # This worker's metrics, for whichever worker answers the next scrape
+    path = os.path.join(directory, f"{os.getpid()}.json")
+    with open(path + ".tmp", 'w') as f:
+        json.dump({'pid': os.getpid(), 'tracer': get_tracer().snapshot(), 'gauges': _gauges()}, f)
+    os.replace(path + ".tmp", path)
+
+
+def _merged_metrics(directory):
+    # Histograms and error counts summed over all workers (others' up to
+    # METRICS_EVERY old); gauges keep a pid label
+    _write_snapshot(directory)
+    tracer, gauges = Tracer(), {}
+    for path in glob.glob(os.path.join(directory, "*.json")):
+        try:
+            with open(path) as f:
+                snapshot = json.load(f)
+        except (OSError, ValueError):
+            continue        # worker exiting
+        tracer.merge(snapshot['tracer'])
+        gauges.update((f'{name}{{pid="{snapshot["pid"]}"}}', value) for name, value in snapshot['gauges'].items())
+    return tracer.render(gauges)
+
+
+async def _snapshot_loop(app):
+    directory = app['metrics_dir']
+    try:
+        while True:
+            await _in_thread(_write_snapshot, directory)
+            await asyncio.sleep(METRICS_EVERY)
+    except asyncio.CancelledError:
+        pass
+    finally:
+        try:
+            os.remove(os.path.join(directory, f"{os.getpid()}.json"))
+        except OSError:
+            pass
+
+
+async def _start_snapshots(app):
+    if app['metrics_dir']:
+        app['snapshots'] = asyncio.create_task(_snapshot_loop(app))
+
+
+async def _stop_snapshots(app):
+    if app['metrics_dir']:
+        app['snapshots'].cancel()
+        await app['snapshots']
+
+
+async def prometheus(request):
+    directory = request.app['metrics_dir']
+    if directory:
+        text = await _in_thread(_merged_metrics, directory)
+    else:
+        text = get_tracer().render(await _in_thread(_gauges))
+    return web.Response(body=text.encode('utf-8'),
+                        headers={'Content-Type': 'text/plain; version=0.0.4; charset=utf-8'})
+
+
+async def traces(request):
+    try:
+        min_ms = float(request.query.get('min_ms', 0))
+    except ValueError:
+        raise web.HTTPBadRequest(text="min_ms must be a number")
+    found = get_tracer().traces(min_ms, request.query.get('trace_id'))
+    return web.json_response({'traces': found[:100]})
+
+
+async def charts(request):
+    births = await _json_list(request, 'births')
+    if not all(isinstance(b, dict) and b.get('birth_date') for b in births):
+        raise web.HTTPBadRequest(text="every birth needs a birth_date")
+    try:
+        result = await _in_thread(core.charts, births)
+    except ValueError as e:
+        raise web.HTTPBadRequest(text=str(e))
+    return web.json_response({'charts': result})
+
+
+async def predictions(request):
+    items = await _json_list(request, 'items')
+    if not all(isinstance(i, dict) for i in items):
+        raise web.HTTPBadRequest(text="items must be objects")
+    return web.json_response({'predictions': await _in_thread(core.predict, items)})
+
+
+async def rules(request):
+    items = await _json_list(request, 'items')
+    if not all(isinstance(i, dict) and i.get('birth_date') for i in items):
+        raise web.HTTPBadRequest(text="every item needs a birth_date")
+    lang = _lang((await request.json()).get('lang', "English"))
+    try:
+        result = await _in_thread(core.rules, items, lang)
+    except ValueError as e:
+        raise web.HTTPBadRequest(text=str(e))
+    return web.json_response({'readings': result})
+
+
+async def parse_texts(request):
+    texts = await _json_list(request, 'texts')
+    result = await _in_thread(parse_many, [str(t) for t in texts])
+    return web.json_response({'parsed': [{'birth_date': d, 'question': q} for d, q in result]})
+
+
+async def chat(request):
+    try:
+        body = await request.json()
+        message = str(body['message']).strip()
+    except Exception:
+        raise web.HTTPBadRequest(text='expected {"message": ..., "lang": ...}')
+    lang = _lang(body.get('lang', "English"))
+    context = body.get('context') or None
+    if context is not None and not (isinstance(context, list)
+                                    and all(isinstance(m, dict) and 'role' in m and 'content' in m for m in context)):
+        raise web.HTTPBadRequest(text='context must be a list of {"role", "content"}')
+    response = web.StreamResponse(headers={'Content-Type': 'text/plain; charset=utf-8',
+                                           'Cache-Control': 'no-cache'})
+    response.enable_chunked_encoding()
+    await response.prepare(request)
+    tokens = _iterate_in_thread(core.reply(message, lang, context))
+    try:
+        async for token in tokens:
+            await response.write(token.encode('utf-8'))
+    finally:
+        await tokens.aclose()
+    await response.write_eof()
+    return response
+
+
+async def tts(request):
+    try:
+        body = await request.json()
+        text = str(body['text'])
+    except Exception:
+        raise web.HTTPBadRequest(text='expected {"text": ..., "lang": ...}')
+    lang = _lang(body.get('lang', "English"))
+    engine = request.app['tts']
+    try:
+        audio = await _in_thread(engine.synthesize, text, lang)
+    except Exception as e:
+        # gTTS needs the network; report it as an upstream failure
+        raise web.HTTPBadGateway(text=f"speech synthesis failed: {e}")
+    if audio is None:
+        return web.Response(status=204)
+    return web.Response(body=audio.getvalue(), content_type=engine.mime)
+
+
+def make_app(metrics_dir=None):
+    # metrics_dir: shared by the workers of one service, so /metrics covers all
+    from jyotish.tts import TTSEngine
+    app = web.Application(client_max_size=16 * 1024 * 1024, middlewares=[tracing_middleware])
+    app.on_response_prepare.append(_trace_header)
+    app.on_startup.append(_start_snapshots)
+    app.on_cleanup.append(_stop_snapshots)
+    app['tts'] = TTSEngine()
+    app['metrics_dir'] = metrics_dir
+    app.router.add_get('/health', health)
+    app.router.add_get('/metrics', prometheus)
+    app.router.add_get('/v1/metrics', metrics)
+    app.router.add_get('/v1/traces', traces)
+    app.router.add_post('/v1/charts', charts)
+    app.router.add_post('/v1/predictions', predictions)
+    app.router.add_post('/v1/rules', rules)
+    app.router.add_post('/v1/parse', parse_texts)
+    app.router.add_post('/v1/chat', chat)
+    app.router.add_post('/v1/tts', tts)
+    return app
+
+# ========================================
+# WORKERS
+# ========================================
+def _serve(host, port, metrics_dir=None):
+    web.run_app(make_app(metrics_dir), host=host, port=port, reuse_port=True, print=None)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="JyotishAI HTTP service")
+    parser.add_argument("--host", default=DEFAULT_HOST)
+    parser.add_argument("--port", type=int, default=DEFAULT_PORT)
+    parser.add_argument("--workers", type=int, default=1, help="processes sharing the port")
+    args = parser.parse_args(argv)
+
+    print(f"JyotishAI service on http://{args.host}:{args.port} ({args.workers} worker(s))")
+    if args.workers <= 1:
+        _serve(args.host, args.port)
+        return
+    # Fresh interpreters: each worker owns its gateway thread, caches and model
+    ctx = multiprocessing.get_context('spawn')
+    metrics_dir = tempfile.mkdtemp(prefix="jyotish-metrics-")
+    workers = [ctx.Process(target=_serve, args=(args.host, args.port, metrics_dir), daemon=True)
+               for _ in range(args.workers)]
+    for w in workers:
+        w.start()
+    try:
+        for w in workers:
+            w.join()
+    except KeyboardInterrupt:
+        for w in workers:
+            w.terminate()
+    finally:
+        shutil.rmtree(metrics_dir, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    main()
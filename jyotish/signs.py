@@ -0,0 +1,31 @@
+# ========================================
+# JyotishAI – Signs, grahas and places
+# Plain constants shared by the chart engine and everything that only needs
+# names (caches, prompts, parser), without importing NumPy.
+# ========================================
+SIGNS = ['Aries', 'Taurus', 'Gemini', 'Cancer', 'Leo', 'Virgo', 'Libra', 'Scorpio', 'Sagittarius', 'Capricorn', 'Aquarius', 'Pisces']
+NEPALI_SIGNS = ['मेष', 'वृष', 'मिथुन', 'कर्कट', 'सिंह', 'कन्या', 'तुला', 'वृश्चिक', 'धनु', 'मकर', 'कुम्भ', 'मीन']
+
+# Same order as the columns of data/clean/clean_kundali.csv
+GRAHAS = ['sun', 'moon', 'mars', 'mercury', 'jupiter', 'venus', 'saturn', 'rahu', 'ketu']
+COLUMNS = ['lagna'] + GRAHAS
+
+DEFAULT_TIME = "12:00"
+DEFAULT_PLACE = "Kathmandu"
+
+# (latitude, east longitude) of the places that show up in our data
+PLACES = {
+    'kathmandu': (27.7172, 85.3240), 'lalitpur': (27.6644, 85.3188),
+    'bhaktapur': (27.6710, 85.4298), 'pokhara': (28.2096, 83.9856),
+    'biratnagar': (26.4525, 87.2718), 'chitwan': (27.5291, 84.3542),
+    'bharatpur': (27.6766, 84.4322), 'butwal': (27.7006, 83.4484),
+    'dharan': (26.8065, 87.2846), 'nepalgunj': (28.0500, 81.6167),
+    'janakpur': (26.7288, 85.9263), 'hetauda': (27.4280, 85.0322),
+    'birgunj': (27.0104, 84.8770), 'dhangadhi': (28.6940, 80.5930),
+}
+
+
+def normalize_place(place):
+    if not place:
+        return DEFAULT_PLACE.lower()
+    return str(place).split(',')[0].strip().lower()
@@ -0,0 +1,240 @@
+# ========================================
+# JyotishAI – Startup Import Benchmark
+# Measures what the Streamlit entry points import before first render,
+# using `python -X importtime` in a fresh interpreter per entry point: the
+# script runs once against a stub streamlit (widgets unset, buttons not
+# pressed), so imports reached from module-level calls count too. It
+# fails when the cost or the set of third-party packages grows past the
+# saved baseline.
+#
+#   python -m jyotish.startup            # check against bench/startup_baseline.json
+#   python -m jyotish.startup --update   # re-record the baseline
+# ========================================
+import argparse
+import ast
+import json
+import os
+import subprocess
+import sys
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+ENTRY_POINTS = ['app.py', 'chatbot.py', 'kundali.py']
+BASELINE_PATH = os.path.join(ROOT, "bench", "startup_baseline.json")
+TOLERANCE = 0.25        # relative slack before a slowdown counts as a regression
+SLACK_MS = 30.0         # absolute slack, so tiny totals don't fail on noise
+REPEATS = 5
+
+# Stand-in for streamlit during the probe: every call returns an unset
+# widget (falsy), containers are no-ops and decorators return the function
+_PROBE = """
+import runpy
+import sys
+import types
+
+
+class Stub:
+    def __call__(self, *args, **kwargs):
+        if len(args) == 1 and callable(args[0]) and not kwargs:
+            return args[0]
+        return Stub()
+
+    def __getattr__(self, name):
+        return Stub()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+    def __bool__(self):
+        return False
+
+    def __iter__(self):
+        return iter(())
+
+
+class SessionState(dict):
+    def __getattr__(self, name):
+        try:
+            return self[name]
+        except KeyError:
+            raise AttributeError(name)
+
+    def __setattr__(self, name, value):
+        self[name] = value
+
+
+def columns(spec, **kwargs):
+    return [Stub() for _ in range(spec if isinstance(spec, int) else len(spec))]
+
+
+st = types.ModuleType('streamlit')
+st.__getattr__ = lambda name: Stub()
+st.session_state = SessionState()
+st.columns = st.tabs = columns
+sys.modules['streamlit'] = st
+
+script, names = sys.argv[1], sys.argv[2:]
+missing = []
+for name in names:
+    try:
+        __import__(name)
+    except ImportError:
+        missing.append(name)
+error = ''
+if script and not missing:
+    sys.argv = [script]
+    try:
+        runpy.run_path(script, run_name='__main__')
+    except BaseException as e:
+        error = f"{type(e).__name__}: {e}"
+print("missing:" + ",".join(missing))
+print("error:" + error.replace(chr(10), ' '))
+"""
+
+
+def startup_imports(path):
+    # Modules imported at the top level of a script, i.e. on every rerun;
+    # imports inside functions or `if` blocks are lazy by construction
+    with open(path, encoding='utf-8') as f:
+        tree = ast.parse(f.read(), path)
+    names = []
+    for node in tree.body:
+        if isinstance(node, ast.Import):
+            names.extend(alias.name for alias in node.names)
+        elif isinstance(node, ast.ImportFrom) and node.module and not node.level:
+            names.append(node.module)
+    return list(dict.fromkeys(names))
+
+
+def _importtime(modules, script=''):
+    # [(name, depth, self_us, cumulative_us)], missing modules, error running
+    # the script ('' if none). The script only runs when nothing is missing.
+    env = dict(os.environ, PYTHONPATH=ROOT + os.pathsep + os.environ.get('PYTHONPATH', ''))
+    proc = subprocess.run([sys.executable, '-X', 'importtime', '-c', _PROBE, script] + modules,
+                          capture_output=True, text=True, cwd=ROOT, env=env)
+    rows = []
+    for line in proc.stderr.splitlines():
+        if not line.startswith('import time:') or 'self [us]' in line:
+            continue
+        self_us, cum_us, name = line[len('import time:'):].split('|')
+        depth = (len(name) - len(name.lstrip())) // 2
+        rows.append((name.strip(), depth, int(self_us), int(cum_us)))
+    status = dict(line.split(':', 1) for line in proc.stdout.splitlines()[-2:] if ':' in line)
+    if 'missing' not in status:
+        raise RuntimeError(f"startup probe failed: {proc.stderr.strip().splitlines()[-1:]}")
+    missing = [m for m in status['missing'].split(',') if m]
+    return rows, missing, status.get('error', '')
+
+
+def _interpreter_modules():
+    rows, _, _ = _importtime([])
+    return {name for name, _, _, _ in rows}
+
+
+def measure(path, repeats=REPEATS, skip=None):
+    # streamlit is stubbed: its own import time is not the app's to gate
+    modules = [m for m in startup_imports(path) if m.split('.')[0] != 'streamlit']
+    skip = skip if skip is not None else _interpreter_modules()
+    best = None
+    for _ in range(repeats):
+        rows, missing, error = _importtime(modules, path)
+        if error:
+            raise RuntimeError(f"{os.path.basename(path)} failed against the streamlit stub: {error}")
+        top = [(name, cum) for name, depth, _, cum in rows if depth == 0 and name not in skip]
+        total_ms = sum(cum for _, cum in top) / 1000
+        if best is None or total_ms < best['total_ms']:
+            by_import = _by_import(rows, skip, missing)
+            best = {
+                'total_ms': round(total_ms, 1),
+                'packages': sorted({p for _, packages in by_import.values() for p in packages}),
+                'missing': missing,
+                'top': [(name, round(cum / 1000, 1)) for name, cum in sorted(top, key=lambda t: -t[1])[:8]],
+                'by_import': {root: [round(ms, 1), sorted(packages)] for root, (ms, packages) in by_import.items()},
+            }
+    return best
+
+
+def _by_import(rows, skip, missing):
+    # {top-level package the script imports: [ms, third-party packages first
+    # loaded under it]}. importtime lists a module after everything it
+    # pulled in, so each depth-0 row closes the group of rows before it.
+    out, group = {}, []
+    for name, depth, _, cum in rows:
+        group.append(name)
+        if depth or name in skip:
+            continue
+        entry = out.setdefault(name.split('.')[0], [0.0, set()])
+        entry[0] += cum / 1000
+        entry[1].update(r for r in (n.split('.')[0] for n in group if n not in skip)
+                        if r not in sys.stdlib_module_names and r not in missing and not r.startswith('_'))
+        group = []
+    return out
+
+
+def compare(baseline, current, tolerance=TOLERANCE, slack_ms=SLACK_MS):
+    # List of regression messages for one entry point
+    problems = []
+    limit = baseline['total_ms'] * (1 + tolerance) + slack_ms
+    # Packages missing where the baseline was recorded (e.g. streamlit) don't
+    # count here, neither their import time nor what they pull in; packages
+    # missing here only make the current number smaller
+    unmeasured = set(baseline['missing'])
+    by_import = current.get('by_import') or {}
+    total_ms = current['total_ms'] - sum(by_import[r][0] for r in unmeasured if r in by_import)
+    if set(current['missing']) <= unmeasured and total_ms > limit:
+        problems.append(f"import cost {total_ms:.0f} ms > {limit:.0f} ms "
+                        f"(baseline {baseline['total_ms']:.0f} ms)")
+    if by_import:
+        packages = {p for root, (_, found) in by_import.items() if root not in unmeasured for p in found}
+    else:
+        packages = set(current['packages'])
+    new = sorted(packages - unmeasured - set(baseline['packages']))
+    if new:
+        problems.append(f"new packages imported at startup: {', '.join(new)}")
+    return problems
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="JyotishAI startup import benchmark")
+    parser.add_argument("--update", action="store_true", help="record the current numbers as the baseline")
+    parser.add_argument("--baseline", default=BASELINE_PATH)
+    parser.add_argument("--repeats", type=int, default=REPEATS)
+    parser.add_argument("--tolerance", type=float, default=TOLERANCE)
+    args = parser.parse_args(argv)
+
+    skip = _interpreter_modules()
+    results = {}
+    for entry in ENTRY_POINTS:
+        result = results[entry] = measure(os.path.join(ROOT, entry), args.repeats, skip)
+        top = ", ".join(f"{name} {ms:.0f}" for name, ms in result['top'][:4])
+        print(f"{entry:12s} {result['total_ms']:8.1f} ms  [{top}]")
+        if result['missing']:
+            print(f"{'':12s} not installed here: {', '.join(result['missing'])}")
+
+    if args.update:
+        os.makedirs(os.path.dirname(args.baseline), exist_ok=True)
+        with open(args.baseline, 'w') as f:
+            json.dump({e: {k: r[k] for k in ('total_ms', 'packages', 'missing')} for e, r in results.items()},
+                      f, indent=2)
+            f.write("\n")
+        print(f"baseline -> {args.baseline}")
+        return 0
+
+    if not os.path.exists(args.baseline):
+        print(f"no baseline at {args.baseline}; run with --update first")
+        return 1
+    with open(args.baseline) as f:
+        baseline = json.load(f)
+    failed = False
+    for entry, result in results.items():
+        for problem in compare(baseline.get(entry, result), result, args.tolerance):
+            print(f"REGRESSION {entry}: {problem}")
+            failed = True
+    print("startup imports: " + ("FAILED" if failed else "ok"))
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,11 @@
+# ========================================
+# JyotishAI – small shared stats helpers
+# ========================================
+
+
+def percentile(samples, q):
+    # Nearest-rank percentile (q in 0..100) of an unsorted sample
+    if not samples:
+        return None
+    ordered = sorted(samples)
+    return ordered[min(len(ordered) - 1, int(q / 100.0 * len(ordered)))]
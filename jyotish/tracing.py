@@ -0,0 +1,304 @@
+# ========================================
+# JyotishAI – Tracing
+# Spans around each pipeline stage (context manager, decorator, or wrapped
+# token iterator), tagged with the session's trace id and aggregated into
+# fixed-bucket histograms in-process. Cheap enough to leave on: a span is
+# two clock reads, one bisect and one short lock. Exported as Prometheus
+# text (GET /metrics on jyotish.service); recent traces keep their span
+# breakdown so one slow turn can be looked at on its own.
+#
+# Sampled profiling: JYOTISH_PROFILE_RATE=0.01 runs cProfile on 1% of
+# traces and keeps the .prof of those slower than JYOTISH_PROFILE_MIN_MS.
+# ========================================
+import bisect
+import contextvars
+import functools
+import inspect
+import os
+import random
+import re
+import threading
+import time
+import uuid
+from collections import deque
+from contextlib import contextmanager
+
+# Seconds; tuned for a pipeline spanning sub-ms parsing to multi-second LLM calls
+BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+KEEP_TRACES = 200
+
+PROFILE_RATE = float(os.environ.get("JYOTISH_PROFILE_RATE", "0") or 0)
+PROFILE_MIN_MS = float(os.environ.get("JYOTISH_PROFILE_MIN_MS", "500") or 500)
+PROFILE_DIR = os.environ.get("JYOTISH_PROFILE_DIR", "data/cache/profiles")
+
+_trace_id = contextvars.ContextVar("jyotish_trace_id", default=None)
+_trace_spans = contextvars.ContextVar("jyotish_trace_spans", default=None)
+_profile_lock = threading.Lock()     # cProfile: one active profiler per process
+
+
+class Histogram:
+    def __init__(self, buckets=BUCKETS):
+        self.buckets = buckets
+        self.counts = [0] * (len(buckets) + 1)     # last slot: +Inf
+        self.sum = 0.0
+        self.count = 0
+
+    def observe(self, seconds):
+        self.counts[bisect.bisect_left(self.buckets, seconds)] += 1
+        self.sum += seconds
+        self.count += 1
+
+    def quantile(self, q):
+        # Upper bound of the bucket holding the q-quantile (Prometheus-style estimate)
+        if not self.count:
+            return None
+        rank, seen = q * self.count, 0
+        for i, n in enumerate(self.counts):
+            seen += n
+            if seen >= rank:
+                return self.buckets[i] if i < len(self.buckets) else float('inf')
+        return float('inf')
+
+
+class Tracer:
+    def __init__(self, buckets=BUCKETS, keep=KEEP_TRACES):
+        self.buckets = buckets
+        self._stages = {}
+        self._errors = {}
+        self._traces = deque(maxlen=keep)
+        self._lock = threading.Lock()
+
+    def observe(self, stage, seconds, error=None):
+        with self._lock:
+            hist = self._stages.get(stage)
+            if hist is None:
+                hist = self._stages[stage] = Histogram(self.buckets)
+            hist.observe(seconds)
+        if error is not None:
+            self.count_error(stage, error)
+
+    def count_error(self, stage, error):
+        with self._lock:
+            key = (stage, error)
+            self._errors[key] = self._errors.get(key, 0) + 1
+
+    def finish_trace(self, trace_id, seconds, spans):
+        with self._lock:
+            self._traces.append({'trace_id': trace_id, 'ms': round(seconds * 1000, 2), 'spans': spans})
+
+    def traces(self, min_ms=0.0, trace_id=None):
+        # Recent traces, newest first; spans as (stage, ms, error or None)
+        with self._lock:
+            found = list(self._traces)
+        return [t for t in reversed(found)
+                if t['ms'] >= min_ms and (trace_id is None or t['trace_id'] == trace_id)]
+
+    def summary(self):
+        # {stage: {'count', 'mean_ms', 'p50_ms', 'p95_ms', 'errors'}}
+        with self._lock:
+            out = {}
+            for stage, hist in sorted(self._stages.items()):
+                p50, p95 = hist.quantile(0.5), hist.quantile(0.95)
+                out[stage] = {
+                    'count': hist.count,
+                    'mean_ms': round(hist.sum / hist.count * 1000, 2),
+                    'p50_ms': _ms(p50), 'p95_ms': _ms(p95),
+                    'errors': sum(n for (s, _), n in self._errors.items() if s == stage),
+                }
+            return out
+
+    def snapshot(self):
+        # Histograms and error counts as plain JSON, for merging across processes
+        with self._lock:
+            return {'stages': {stage: [list(hist.counts), hist.sum, hist.count]
+                               for stage, hist in self._stages.items()},
+                    'errors': [[stage, error, n] for (stage, error), n in self._errors.items()]}
+
+    def merge(self, snapshot):
+        # Adds another process's snapshot (same buckets) into this tracer
+        with self._lock:
+            for stage, (counts, total, count) in snapshot['stages'].items():
+                hist = self._stages.get(stage)
+                if hist is None:
+                    hist = self._stages[stage] = Histogram(self.buckets)
+                hist.counts = [a + b for a, b in zip(hist.counts, counts)]
+                hist.sum += total
+                hist.count += count
+            for stage, error, n in snapshot['errors']:
+                self._errors[(stage, error)] = self._errors.get((stage, error), 0) + n
+
+    def render(self, gauges=None):
+        # Prometheus text exposition format (0.0.4)
+        lines = ["# HELP jyotish_stage_seconds Time spent in each pipeline stage.",
+                 "# TYPE jyotish_stage_seconds histogram"]
+        with self._lock:
+            for stage, hist in sorted(self._stages.items()):
+                label = _escape(stage)
+                cumulative = 0
+                for le, n in zip(self.buckets + ('+Inf',), hist.counts):
+                    cumulative += n
+                    lines.append(f'jyotish_stage_seconds_bucket{{stage="{label}",le="{le}"}} {cumulative}')
+                lines.append(f'jyotish_stage_seconds_sum{{stage="{label}"}} {hist.sum:.6f}')
+                lines.append(f'jyotish_stage_seconds_count{{stage="{label}"}} {hist.count}')
+            lines += ["# HELP jyotish_stage_errors_total Exceptions raised inside a stage.",
+                      "# TYPE jyotish_stage_errors_total counter"]
+            for (stage, error), n in sorted(self._errors.items()):
+                lines.append(f'jyotish_stage_errors_total{{stage="{_escape(stage)}",error="{_escape(error)}"}} {n}')
+        # Gauge keys may carry labels ('jyotish_llm_queue_depth{pid="12"}')
+        last = None
+        for key, value in sorted((gauges or {}).items()):
+            name = key.split('{')[0]
+            if name != last:
+                lines.append(f"# TYPE {name} gauge")
+                last = name
+            lines.append(f"{key} {value}")
+        return "\n".join(lines) + "\n"
+
+
+def _ms(seconds):
+    # None past the last bucket, so summaries stay valid JSON
+    return None if seconds == float('inf') else round(seconds * 1000, 2)
+
+
+def _escape(value):
+    return str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+
+def flatten_gauges(metrics, prefix="jyotish"):
+    # Numeric leaves of a nested metrics dict -> {'jyotish_llm_queue_depth': 0, ...}
+    out = {}
+    for key, value in metrics.items():
+        name = f"{prefix}_{key}"
+        if isinstance(value, dict):
+            out.update(flatten_gauges(value, name))
+        elif isinstance(value, (int, float)) and not isinstance(value, bool):
+            out[name] = value
+    return out
+
+
+_tracer = Tracer()
+
+
+def get_tracer():
+    return _tracer
+
+# ========================================
+# SPANS
+# ========================================
+def current_trace():
+    return _trace_id.get()
+
+
+@contextmanager
+def trace(trace_id=None):
+    # Root of one request/turn; spans inside (and in threads started with a
+    # copied context) are tagged with its id
+    trace_id = trace_id or uuid.uuid4().hex[:16]
+    spans = []
+    id_token, spans_token = _trace_id.set(trace_id), _trace_spans.set(spans)
+    profiler = _start_profile()
+    start = time.perf_counter()
+    try:
+        yield trace_id
+    finally:
+        seconds = time.perf_counter() - start
+        _trace_id.reset(id_token)
+        _trace_spans.reset(spans_token)
+        if profiler is not None:
+            _stop_profile(profiler, trace_id, seconds)
+        _tracer.finish_trace(trace_id, seconds, spans)
+
+
+def _record(stage, seconds, error=None):
+    _tracer.observe(stage, seconds, error)
+    spans = _trace_spans.get()
+    if spans is not None:
+        spans.append((stage, round(seconds * 1000, 3), error))
+
+
+def record_error(stage, exc):
+    # For failures that are handled (fallback answers, retries) but should
+    # still show up in the error counters
+    _tracer.count_error(stage, type(exc).__name__)
+
+
+@contextmanager
+def span(stage):
+    start = time.perf_counter()
+    try:
+        yield
+    except BaseException as e:
+        _record(stage, time.perf_counter() - start, type(e).__name__)
+        raise
+    _record(stage, time.perf_counter() - start)
+
+
+def traced_iter(stage, iterable):
+    # Times a token stream until exhausted, plus its first item as "<stage>_first"
+    start = time.perf_counter()
+    first = True
+    try:
+        for item in iterable:
+            if first:
+                _record(stage + "_first", time.perf_counter() - start)
+                first = False
+            yield item
+    except BaseException as e:
+        # GeneratorExit: the consumer stopped early (e.g. client went away)
+        _record(stage, time.perf_counter() - start, type(e).__name__)
+        raise
+    _record(stage, time.perf_counter() - start)
+
+
+def traced(stage):
+    # Decorator; generator functions are timed over their whole iteration
+    def wrap(fn):
+        if inspect.isgeneratorfunction(fn):
+            @functools.wraps(fn)
+            def gen_wrapper(*args, **kwargs):
+                return traced_iter(stage, fn(*args, **kwargs))
+            return gen_wrapper
+
+        @functools.wraps(fn)
+        def wrapper(*args, **kwargs):
+            with span(stage):
+                return fn(*args, **kwargs)
+        return wrapper
+    return wrap
+
+
+def in_context(fn):
+    # For executor hand-offs: run fn with the caller's trace id
+    return functools.partial(contextvars.copy_context().run, fn)
+
+# ========================================
+# SAMPLED PROFILING
+# ========================================
+def _start_profile():
+    if PROFILE_RATE <= 0 or random.random() >= PROFILE_RATE:
+        return None
+    if not _profile_lock.acquire(blocking=False):
+        return None
+    import cProfile
+    profiler = cProfile.Profile()
+    try:
+        profiler.enable()
+    except ValueError:
+        # another profiler is already active in this process
+        _profile_lock.release()
+        return None
+    return profiler
+
+
+def _stop_profile(profiler, trace_id, seconds):
+    try:
+        profiler.disable()
+        if seconds * 1000 >= PROFILE_MIN_MS:
+            # Trace ids can come from request headers; keep them out of the path
+            name = re.sub(r'[^A-Za-z0-9_-]', '_', trace_id)
+            os.makedirs(PROFILE_DIR, exist_ok=True)
+            profiler.dump_stats(os.path.join(PROFILE_DIR, f"{name}-{int(time.time())}.prof"))
+    except OSError as e:
+        record_error('profile', e)
+    finally:
+        _profile_lock.release()
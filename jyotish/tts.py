@@ -0,0 +1,180 @@
+# ========================================
+# JyotishAI – Text-to-Speech
+# In-memory synthesis (no temp files), sentence-level chunks cached by
+# content hash, and a pluggable backend so tests can run without gTTS or
+# the network.
+# ========================================
+import hashlib
+import io
+import math
+import re
+import struct
+import threading
+import wave
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+
+from jyotish.tracing import in_context, span
+
+MAX_CACHE_BYTES = 32 * 1024 * 1024
+TTS_WORKERS = 2
+
+_MARKUP = re.compile(r'\*\*|\*|_|\n')
+_SENTENCE_END = re.compile(r'(?<=[.!?।])\s+')
+
+
+def clean_text(text):
+    return re.sub(r'\s+', ' ', _MARKUP.sub(' ', text)).strip()
+
+
+def split_sentences(text):
+    # Fixed strings such as the remedies end up as their own chunk, so they
+    # are synthesized once and reused across replies.
+    return [s for s in _SENTENCE_END.split(text) if s.strip()]
+
+
+def lang_code(lang):
+    return "en" if lang == "English" else "hi"
+
+# ========================================
+# BACKENDS
+# ========================================
+class GTTSBackend:
+    mime = "audio/mp3"
+
+    def synthesize(self, text, lang_code):
+        from gtts import gTTS
+        buf = io.BytesIO()
+        gTTS(text, lang=lang_code, slow=False).write_to_fp(buf)
+        return buf.getvalue()
+
+    def join(self, parts):
+        # MP3 is a stream of self-contained frames; chunks concatenate cleanly
+        return b"".join(parts)
+
+
+class ToneBackend:
+    # Offline stand-in: a short deterministic WAV tone per chunk
+    mime = "audio/wav"
+    rate = 8000
+
+    def synthesize(self, text, lang_code):
+        seconds = min(5.0, 0.05 * len(text))
+        pitch = 220 + int(hashlib.md5(lang_code.encode()).hexdigest(), 16) % 220
+        frames = b"".join(
+            struct.pack('<h', int(8000 * math.sin(2 * math.pi * pitch * i / self.rate)))
+            for i in range(int(seconds * self.rate))
+        )
+        return self._wav([frames])
+
+    def _wav(self, frame_parts):
+        buf = io.BytesIO()
+        with wave.open(buf, 'wb') as w:
+            w.setnchannels(1)
+            w.setsampwidth(2)
+            w.setframerate(self.rate)
+            for frames in frame_parts:
+                w.writeframes(frames)
+        return buf.getvalue()
+
+    def join(self, parts):
+        frames = []
+        for part in parts:
+            with wave.open(io.BytesIO(part), 'rb') as w:
+                frames.append(w.readframes(w.getnframes()))
+        return self._wav(frames)
+
+# ========================================
+# ENGINE + CACHE
+# ========================================
+class TTSJob:
+    # Background synthesis handle; cancel() also stops a job that already
+    # started, between two sentence chunks.
+    def __init__(self):
+        self.cancelled = threading.Event()
+        self.future = None
+
+    def cancel(self):
+        self.cancelled.set()
+        self.future.cancel()
+
+    def done(self):
+        return self.future.done()
+
+    def result(self):
+        if self.cancelled.is_set() or self.future.cancelled():
+            return None
+        try:
+            return self.future.result()
+        except Exception:
+            return None
+
+
+class TTSEngine:
+    def __init__(self, backend=None, max_bytes=MAX_CACHE_BYTES):
+        self.backend = backend or GTTSBackend()
+        self.max_bytes = max_bytes
+        self.hits = self.misses = self.evictions = 0
+        self._cache = OrderedDict()
+        self._bytes = 0
+        self._lock = threading.Lock()
+        self._executor = None
+
+    @property
+    def mime(self):
+        return self.backend.mime
+
+    def _key(self, chunk, code):
+        return hashlib.sha256(f"{code}\0{chunk}".encode('utf-8')).hexdigest()
+
+    def _chunk_audio(self, chunk, code):
+        key = self._key(chunk, code)
+        with self._lock:
+            audio = self._cache.get(key)
+            if audio is not None:
+                self._cache.move_to_end(key)
+                self.hits += 1
+                return audio
+            self.misses += 1
+        with span('tts_backend'):
+            audio = self.backend.synthesize(chunk, code)
+        with self._lock:
+            if key not in self._cache:
+                self._cache[key] = audio
+                self._bytes += len(audio)
+            while self._bytes > self.max_bytes and len(self._cache) > 1:
+                _, old = self._cache.popitem(last=False)
+                self._bytes -= len(old)
+                self.evictions += 1
+        return audio
+
+    def synthesize(self, text, lang, cancelled=None):
+        # BytesIO ready for st.audio, or None when there is nothing to say
+        with span('tts'):
+            return self._synthesize(text, lang, cancelled)
+
+    def _synthesize(self, text, lang, cancelled):
+        clean = clean_text(text)
+        if not clean:
+            return None
+        code = lang_code(lang)
+        parts = []
+        for chunk in split_sentences(clean):
+            if cancelled is not None and cancelled.is_set():
+                return None
+            parts.append(self._chunk_audio(chunk, code))
+        return io.BytesIO(self.backend.join(parts))
+
+    def submit(self, text, lang):
+        with self._lock:
+            if self._executor is None:
+                self._executor = ThreadPoolExecutor(max_workers=TTS_WORKERS, thread_name_prefix="tts")
+        job = TTSJob()
+        # in_context: the synthesis spans count towards the caller's trace
+        job.future = self._executor.submit(in_context(self.synthesize), text, lang, job.cancelled)
+        return job
+
+    def stats(self):
+        with self._lock:
+            return {'chunks': len(self._cache), 'bytes': self._bytes,
+                    'hits': self.hits, 'misses': self.misses, 'evictions': self.evictions}
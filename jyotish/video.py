@@ -0,0 +1,286 @@
+# ========================================
+# JyotishAI – Face Detection Pipeline (video calls)
+# Cascade loaded once per worker thread, detection on a downscaled gray
+# frame every N frames, boxes carried forward in between, and an adaptive
+# mode that sheds work when a frame goes over its latency budget.
+# ========================================
+import os
+import threading
+import time
+from collections import deque
+
+import cv2
+import numpy as np
+
+from jyotish.stats import percentile
+
+CASCADE_PATH = cv2.data.haarcascades + 'haarcascade_frontalface_default.xml'
+BOX_COLOR = (0, 255, 0)
+
+_local = threading.local()
+
+
+def get_cascade():
+    # CascadeClassifier isn't safe to share between threads, so keep one per worker
+    cascade = getattr(_local, 'cascade', None)
+    if cascade is None:
+        cascade = _local.cascade = cv2.CascadeClassifier(CASCADE_PATH)
+    return cascade
+
+
+def detect_faces(img, scale=0.5, min_size=24):
+    gray = cv2.cvtColor(img, cv2.COLOR_BGR2GRAY)
+    if scale != 1.0:
+        gray = cv2.resize(gray, None, fx=scale, fy=scale, interpolation=cv2.INTER_AREA)
+    faces = get_cascade().detectMultiScale(gray, scaleFactor=1.1, minNeighbors=4, minSize=(min_size, min_size))
+    if len(faces) == 0:
+        return np.empty((0, 4), dtype=np.float32)
+    return np.asarray(faces, dtype=np.float32) / scale
+
+
+def draw_boxes(img, boxes):
+    for x, y, w, h in boxes.astype(int):
+        cv2.rectangle(img, (x, y), (x + w, y + h), BOX_COLOR, 2)
+    return img
+
+
+def _match_velocity(prev, cur, frames):
+    # Per-box velocity (px/frame) from nearest-centre matching of two detections
+    if len(prev) == 0 or len(cur) == 0 or frames <= 0:
+        return np.zeros((len(cur), 2), dtype=np.float32)
+    prev_c = prev[:, :2] + prev[:, 2:] / 2
+    cur_c = cur[:, :2] + cur[:, 2:] / 2
+    dist = np.linalg.norm(cur_c[:, None, :] - prev_c[None, :, :], axis=2)
+    nearest = dist.argmin(axis=1)
+    velocity = (cur_c - prev_c[nearest]) / frames
+    # A jump larger than a face width is a different face, not motion
+    velocity[dist.min(axis=1) > cur[:, 2]] = 0
+    return velocity
+
+
+class FacePipeline:
+    def __init__(self, scale=0.5, detect_every=3, budget_ms=25.0, adaptive=True,
+                 min_scale=0.25, max_detect_every=12, min_size=24):
+        self.scale = self.base_scale = scale
+        self.detect_every = self.base_detect_every = detect_every
+        self.budget_ms = budget_ms
+        self.adaptive = adaptive
+        self.min_scale = min_scale
+        self.max_detect_every = max_detect_every
+        self.min_size = min_size
+
+        self.frames = self.detections = 0
+        self._boxes = np.empty((0, 4), dtype=np.float32)
+        self._velocity = np.zeros((0, 2), dtype=np.float32)
+        self._last_detect = 0
+        self._timings = deque(maxlen=300)
+        self._detect_timings = deque(maxlen=300)
+        self._ema = None
+        self._lock = threading.Lock()
+
+    def next_frame(self):
+        with self._lock:
+            frame_no = self.frames
+            self.frames += 1
+            due = frame_no - self._last_detect >= self.detect_every or self.detections == 0
+            return frame_no, due
+
+    def detect(self, img, frame_no):
+        with self._lock:
+            scale = self.scale
+        start = time.perf_counter()
+        boxes = detect_faces(img, scale, self.min_size)
+        elapsed = (time.perf_counter() - start) * 1000
+        with self._lock:
+            if frame_no >= self._last_detect:
+                self._velocity = _match_velocity(self._boxes, boxes, frame_no - self._last_detect)
+                self._boxes = boxes
+                self._last_detect = frame_no
+            self.detections += 1
+            self._detect_timings.append(elapsed)
+        return boxes
+
+    def track(self, frame_no):
+        # Between detections: move each box along its last velocity
+        with self._lock:
+            boxes = self._boxes.copy()
+            boxes[:, :2] += self._velocity * max(0, frame_no - self._last_detect)
+            return boxes
+
+    def boxes_for(self, img):
+        frame_no, due = self.next_frame()
+        if due:
+            return self.detect(img, frame_no).copy()
+        return self.track(frame_no)
+
+    def process(self, img):
+        start = time.perf_counter()
+        draw_boxes(img, self.boxes_for(img))
+        self.record((time.perf_counter() - start) * 1000)
+        return img
+
+    def record(self, ms, adapt=True):
+        with self._lock:
+            self._timings.append(ms)
+        if adapt:
+            self.adapt(ms)
+
+    def adapt(self, ms):
+        # Smoothed latency against the budget: frame time here, detection
+        # time when detection runs off-thread (AsyncFacePipeline)
+        with self._lock:
+            self._ema = ms if self._ema is None else 0.8 * self._ema + 0.2 * ms
+            if not self.adaptive:
+                return
+            if self._ema > self.budget_ms:
+                # Over budget: detect less often first, then on smaller frames
+                if self.detect_every < self.max_detect_every:
+                    self.detect_every += 1
+                elif self.scale > self.min_scale:
+                    self.scale = max(self.min_scale, self.scale * 0.8)
+            elif self._ema < self.budget_ms * 0.5:
+                if self.scale < self.base_scale:
+                    self.scale = min(self.base_scale, self.scale / 0.8)
+                elif self.detect_every > self.base_detect_every:
+                    self.detect_every -= 1
+
+    def stats(self):
+        with self._lock:
+            timings, detect = list(self._timings), list(self._detect_timings)
+            return {
+                'frames': self.frames, 'detections': self.detections,
+                'detect_every': self.detect_every, 'scale': round(self.scale, 3),
+                'frame_ms_p50': percentile(timings, 50), 'frame_ms_p95': percentile(timings, 95),
+                'detect_ms_p50': percentile(detect, 50), 'detect_ms_p95': percentile(detect, 95),
+            }
+
+# ========================================
+# OFF-THREAD DETECTION
+# The frame callback only draws the latest known boxes and hands the frame
+# to a shared worker pool. Each stream has a single latest-frame slot, so a
+# slow detector lowers the annotation rate instead of delaying the video.
+# ========================================
+FRAME_WORKERS = max(1, (os.cpu_count() or 2) // 2)
+
+
+class FrameWorkerPool:
+    def __init__(self, workers=FRAME_WORKERS):
+        self.workers = workers
+        self._ready = deque()           # streams with a frame waiting, each at most once
+        self._cond = threading.Condition()
+        self._threads = [
+            threading.Thread(target=self._work, name=f"face-worker-{i}", daemon=True)
+            for i in range(workers)
+        ]
+        for t in self._threads:
+            t.start()
+
+    def schedule(self, stream):
+        with self._cond:
+            if not stream._scheduled:
+                stream._scheduled = True
+                self._ready.append(stream)
+                self._cond.notify()
+
+    def _work(self):
+        while True:
+            with self._cond:
+                while not self._ready:
+                    self._cond.wait()
+                stream = self._ready.popleft()
+                stream._scheduled = False
+            job = stream._take()
+            if job is None:
+                continue
+            failed = False
+            try:
+                # cv2 releases the GIL inside detectMultiScale, so workers run in parallel
+                stream._detect(*job)
+            except Exception:
+                # A bad frame must not kill the worker or leave the stream busy
+                failed = True
+            finally:
+                stream._done(failed)
+
+    def queue_depth(self):
+        with self._cond:
+            return len(self._ready)
+
+
+class AsyncFacePipeline:
+    def __init__(self, pipeline=None, pool=None):
+        self.pipeline = pipeline or FacePipeline()
+        self.pool = pool or get_frame_pool()
+        self.submitted = self.dropped = self.processed = self.errors = 0
+        self._slot = None
+        self._busy = False
+        self._scheduled = False
+        self._lock = threading.Lock()
+
+    def _take(self):
+        with self._lock:
+            job, self._slot = self._slot, None
+            self._busy = job is not None
+            return job
+
+    def _detect(self, frame_no, img):
+        # The budget applies to detection latency: the callback itself only
+        # draws, so over budget means boxes lag, and the pipeline sheds work
+        start = time.perf_counter()
+        self.pipeline.detect(img, frame_no)
+        self.pipeline.adapt((time.perf_counter() - start) * 1000)
+
+    def _done(self, failed=False):
+        with self._lock:
+            self._busy = False
+            self.processed += 1
+            self.errors += failed
+            again = self._slot is not None
+        if again:
+            self.pool.schedule(self)
+
+    def process(self, img):
+        start = time.perf_counter()
+        frame_no, due = self.pipeline.next_frame()
+        if due:
+            with self._lock:
+                if self._slot is not None:
+                    self.dropped += 1   # latest frame wins
+                self._slot = (frame_no, img.copy())
+                self.submitted += 1
+                idle = not self._busy
+            if idle:
+                self.pool.schedule(self)
+        draw_boxes(img, self.pipeline.track(frame_no))
+        self.pipeline.record((time.perf_counter() - start) * 1000, adapt=False)
+        return img
+
+    def stats(self):
+        stats = self.pipeline.stats()
+        with self._lock:
+            stats.update(submitted=self.submitted, dropped=self.dropped, processed=self.processed,
+                         errors=self.errors)
+        stats['pool_queue'] = self.pool.queue_depth()
+        return stats
+
+
+_pool = None
+_pool_lock = threading.Lock()
+
+
+def get_frame_pool(workers=FRAME_WORKERS):
+    global _pool
+    with _pool_lock:
+        if _pool is None:
+            _pool = FrameWorkerPool(workers)
+        return _pool
+
+
+def frame_callback(pipeline):
+    # streamlit_webrtc video_frame_callback bound to one session's pipeline
+    import av
+
+    def callback(frame):
+        img = pipeline.process(frame.to_ndarray(format="bgr24"))
+        return av.VideoFrame.from_ndarray(img, format="bgr24")
+    return callback
@@ -0,0 +1,405 @@
+# ========================================
+# JyotishAI – Voice Input
+# Browser audio (streamlit_webrtc audio track) -> mono 16 kHz PCM ->
+# energy VAD that cuts each utterance at the end of speech -> recognizers
+# for every language run at once, first confident transcript wins.
+# Nothing here blocks the Streamlit script: frames arrive on the webrtc
+# thread, recognition runs on a shared pool, and the page polls results().
+#
+# Recognizer backends are pluggable: Google (speech_recognition, needs the
+# network) or a scripted ReplayRecognizer for offline runs and tests:
+#
+#   python -m jyotish.voice test.wav --replay data/voice/replay.json
+#   JYOTISH_STT=data/voice/replay.json streamlit run chatbot.py
+# ========================================
+import argparse
+import json
+import os
+import threading
+import time
+import wave
+from collections import deque, namedtuple
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+
+import numpy as np
+
+from jyotish.tracing import in_context, record_error, span
+
+RATE = 16000                    # Hz, what the recognizers are fed
+FRAME_MS = 30                   # VAD decision granularity
+LANGUAGES = ("ne-NP", "en-IN")  # tried concurrently
+MIN_CONFIDENCE = 0.6            # first result at or above this wins
+DEFAULT_CONFIDENCE = 0.5        # for backends that don't report one
+RECOGNIZE_TIMEOUT = 8.0         # seconds for all languages together
+STT_WORKERS = 4                 # utterances being recognized at once
+ATTEMPT_WORKERS = STT_WORKERS * len(LANGUAGES)  # recognizer calls at once
+STT_ENV = "JYOTISH_STT"
+
+Transcript = namedtuple('Transcript', 'text language confidence ms')
+
+
+def to_mono(samples, channels):
+    # Interleaved int16 -> mono float32
+    samples = np.asarray(samples, dtype=np.float32).ravel()
+    if channels > 1:
+        samples = samples[:len(samples) // channels * channels].reshape(-1, channels).mean(axis=1)
+    return samples
+
+
+def resample(samples, rate, target=RATE):
+    if rate == target or len(samples) == 0:
+        return samples
+    n = int(round(len(samples) * target / rate))
+    return np.interp(np.linspace(0, len(samples) - 1, n), np.arange(len(samples)), samples).astype(np.float32)
+
+
+def read_wav(path):
+    # Mono float32 at RATE (int16 scale) from an 8- or 16-bit PCM WAV such as test.wav
+    with wave.open(path, 'rb') as w:
+        raw = w.readframes(w.getnframes())
+        if w.getsampwidth() == 1:
+            pcm = (np.frombuffer(raw, dtype=np.uint8).astype(np.float32) - 128) * 256
+        elif w.getsampwidth() == 2:
+            pcm = np.frombuffer(raw, dtype=np.int16)
+        else:
+            raise ValueError(f"{path}: only 8/16-bit PCM WAV is supported")
+        return resample(to_mono(pcm, w.getnchannels()), w.getframerate())
+
+# ========================================
+# VAD
+# ========================================
+class EnergyVAD:
+    # RMS per frame against an adaptive noise floor. Speech starts after
+    # start_ms above threshold and ends after silence_ms below it, so a
+    # short question is sent as soon as the speaker stops.
+    def __init__(self, rate=RATE, frame_ms=FRAME_MS, ratio=3.0, min_rms=200.0, start_ms=90,
+                 silence_ms=600, min_speech_ms=250, max_speech_s=10.0, preroll_ms=240):
+        self.rate = rate
+        self.frame = rate * frame_ms // 1000
+        self.ratio = ratio
+        self.min_rms = min_rms
+        self.start_frames = max(1, start_ms // frame_ms)
+        self.silence_frames = max(1, silence_ms // frame_ms)
+        self.min_speech_frames = max(1, min_speech_ms // frame_ms)
+        self.max_speech_frames = int(max_speech_s * 1000 // frame_ms)
+        self.noise = None               # running noise-floor RMS
+        self._pending = np.empty(0, dtype=np.float32)
+        self._preroll = deque(maxlen=max(1, preroll_ms // frame_ms))
+        self._speech = []
+        self._loud = self._quiet = self._voiced = 0
+
+    @property
+    def in_speech(self):
+        return bool(self._speech)
+
+    def threshold(self):
+        return max(self.min_rms, (self.noise or 0.0) * self.ratio)
+
+    def feed(self, samples):
+        # Mono float samples at self.rate -> list of finished utterances (int16)
+        data = np.concatenate([self._pending, np.asarray(samples, dtype=np.float32)])
+        n = len(data) // self.frame
+        self._pending = data[n * self.frame:]
+        done = []
+        for frame in data[:n * self.frame].reshape(n, self.frame):
+            utterance = self._step(frame)
+            if utterance is not None:
+                done.append(utterance)
+        return done
+
+    def _step(self, frame):
+        rms = float(np.sqrt(np.mean(frame * frame)))
+        loud = rms > self.threshold()
+        if not self._speech:
+            if not loud:
+                # Ambient calibration happens while nobody talks, not up front
+                self.noise = rms if self.noise is None else 0.95 * self.noise + 0.05 * rms
+                self._loud = 0
+                self._preroll.append(frame)
+                return None
+            self._loud += 1
+            self._preroll.append(frame)
+            if self._loud >= self.start_frames:
+                self._speech = list(self._preroll)
+                self._preroll.clear()
+                self._quiet, self._voiced = 0, self._loud
+            return None
+        self._speech.append(frame)
+        self._quiet = 0 if loud else self._quiet + 1
+        self._voiced += loud
+        if self._quiet >= self.silence_frames or len(self._speech) >= self.max_speech_frames:
+            return self._finish()
+        return None
+
+    def _finish(self):
+        frames, self._speech = self._speech, []
+        voiced = self._voiced
+        self._loud = self._quiet = self._voiced = 0
+        if voiced < self.min_speech_frames:
+            return None
+        return np.clip(np.concatenate(frames), -32768, 32767).astype(np.int16)
+
+    def flush(self):
+        # End of stream: whatever speech is open counts as an utterance
+        return self._finish() if self._speech else None
+
+# ========================================
+# RECOGNIZERS
+# ========================================
+class GoogleRecognizer:
+    # speech_recognition's free Google endpoint (network)
+    def __init__(self):
+        import speech_recognition as sr
+        self._sr = sr
+        self._recognizer = sr.Recognizer()
+
+    def recognize(self, pcm, rate, language):
+        # (text, confidence) or None when nothing was understood
+        audio = self._sr.AudioData(pcm.tobytes(), rate, 2)
+        try:
+            result = self._recognizer.recognize_google(audio, language=language, show_all=True)
+        except self._sr.UnknownValueError:
+            return None
+        alternatives = result.get('alternative') if isinstance(result, dict) else None
+        if not alternatives:
+            return None
+        best = alternatives[0]
+        return best['transcript'], best.get('confidence', DEFAULT_CONFIDENCE)
+
+
+class ReplayRecognizer:
+    # Offline stand-in: a scripted answer (and delay) per language, e.g.
+    #   {"ne-NP": {"text": "...", "confidence": 0.4, "delay_ms": 300},
+    #    "en-IN": {"text": "2004-06-11 career?", "confidence": 0.9}}
+    def __init__(self, script):
+        self.script = script
+        self.calls = 0
+
+    @classmethod
+    def from_file(cls, path):
+        with open(path, encoding='utf-8') as f:
+            return cls(json.load(f))
+
+    def recognize(self, pcm, rate, language):
+        self.calls += 1
+        entry = self.script.get(language)
+        if not entry:
+            return None
+        time.sleep(entry.get('delay_ms', 0) / 1000)
+        if not entry.get('text'):
+            return None
+        return entry['text'], entry.get('confidence', DEFAULT_CONFIDENCE)
+
+
+def make_recognizer(spec=None):
+    # "google" (default), or the path of a replay script; JYOTISH_STT sets it
+    spec = spec or os.environ.get(STT_ENV) or "google"
+    if spec == "google":
+        return GoogleRecognizer()
+    return ReplayRecognizer.from_file(spec)
+
+
+# Two pools: an utterance task blocks while its per-language attempts run,
+# so the attempts must never wait for a slot in the utterance pool
+_executor = None
+_attempts = None
+_executor_lock = threading.Lock()
+
+
+def get_executor():
+    global _executor
+    with _executor_lock:
+        if _executor is None:
+            _executor = ThreadPoolExecutor(max_workers=STT_WORKERS, thread_name_prefix="stt")
+        return _executor
+
+
+def get_attempt_executor():
+    global _attempts
+    with _executor_lock:
+        if _attempts is None:
+            _attempts = ThreadPoolExecutor(max_workers=ATTEMPT_WORKERS, thread_name_prefix="stt-lang")
+        return _attempts
+
+
+def _attempt(recognizer, pcm, rate, language):
+    start = time.perf_counter()
+    try:
+        with span(f"stt {language}"):
+            result = recognizer.recognize(pcm, rate, language)
+    except Exception as e:
+        # Network down, quota, bad audio: the other language may still answer
+        record_error('stt', e)
+        return None
+    if result is None:
+        return None
+    text, confidence = result
+    return Transcript(text.strip(), language, float(confidence), round((time.perf_counter() - start) * 1000, 1))
+
+
+def recognize_first(recognizer, pcm, rate=RATE, languages=LANGUAGES, min_confidence=MIN_CONFIDENCE,
+                    timeout=RECOGNIZE_TIMEOUT):
+    # All languages at once; the first confident transcript returns without
+    # waiting for the rest, otherwise the most confident one that finished
+    pending = {get_attempt_executor().submit(in_context(_attempt), recognizer, pcm, rate, lang) for lang in languages}
+    deadline = time.monotonic() + timeout
+    best = None
+    while pending:
+        done, pending = wait(pending, timeout=max(0.0, deadline - time.monotonic()), return_when=FIRST_COMPLETED)
+        if not done:
+            break       # timed out; stragglers finish on the pool and are dropped
+        for future in done:
+            result = future.result()
+            if result is None or not result.text:
+                continue
+            if result.confidence >= min_confidence:
+                for other in pending:
+                    other.cancel()
+                return result
+            if best is None or result.confidence > best.confidence:
+                best = result
+    return best
+
+# ========================================
+# SESSION INPUT (webrtc audio track)
+# ========================================
+class VoiceInput:
+    # One per Streamlit session. feed*() is called from the webrtc thread;
+    # the script calls results() on each rerun/fragment tick.
+    def __init__(self, recognizer=None, languages=LANGUAGES, vad=None, min_confidence=MIN_CONFIDENCE):
+        self.recognizer = recognizer or make_recognizer()
+        self.languages = languages
+        self.vad = vad or EnergyVAD()
+        self.min_confidence = min_confidence
+        self.utterances = self.recognized = self.missed = 0
+        self._busy = 0
+        self._results = deque()
+        self._lock = threading.Lock()
+
+    @property
+    def state(self):
+        if self._busy:
+            return "recognizing"
+        return "speech" if self.vad.in_speech else "listening"
+
+    def feed(self, samples, rate=RATE):
+        # Mono samples at any rate
+        for pcm in self.vad.feed(resample(np.asarray(samples, dtype=np.float32), rate, self.vad.rate)):
+            self.submit(pcm)
+
+    def feed_frame(self, frame):
+        # av.AudioFrame from streamlit_webrtc (usually packed s16, 48 kHz stereo)
+        data = frame.to_ndarray()
+        if frame.format.is_planar:
+            samples = data.astype(np.float32).mean(axis=0)     # (channels, n)
+        else:
+            samples = to_mono(data, len(frame.layout.channels))
+        self.feed(samples, frame.sample_rate)
+
+    def finish(self):
+        # End of a file/stream: recognize the speech still open
+        pcm = self.vad.flush()
+        if pcm is not None:
+            self.submit(pcm)
+
+    def submit(self, pcm):
+        # One utterance (int16 at the VAD rate) to recognize in the background
+        with self._lock:
+            self.utterances += 1
+            self._busy += 1
+        get_executor().submit(in_context(self._recognize), pcm)
+
+    def _recognize(self, pcm):
+        try:
+            result = recognize_first(self.recognizer, pcm, self.vad.rate, self.languages, self.min_confidence)
+        except Exception as e:
+            record_error('stt', e)
+            result = None
+        with self._lock:
+            self._busy -= 1
+            if result is None:
+                self.missed += 1
+            else:
+                self.recognized += 1
+                self._results.append(result)
+
+    def results(self):
+        # Transcripts finished since the last call (never blocks)
+        with self._lock:
+            out = list(self._results)
+            self._results.clear()
+        return out
+
+    def wait_idle(self, timeout=RECOGNIZE_TIMEOUT + 1):
+        deadline = time.monotonic() + timeout
+        while self._busy and time.monotonic() < deadline:
+            time.sleep(0.01)
+        return not self._busy
+
+    def stats(self):
+        with self._lock:
+            return {'state': self.state, 'utterances': self.utterances, 'recognized': self.recognized,
+                    'missed': self.missed, 'noise_rms': round(self.vad.noise or 0.0, 1)}
+
+
+def audio_callback(voice):
+    # streamlit_webrtc audio_frame_callback: feeds the session's VoiceInput
+    # and sends silence back, so the browser doesn't hear itself
+    import av
+
+    def callback(frame):
+        voice.feed_frame(frame)
+        silent = np.zeros_like(frame.to_ndarray())
+        out = av.AudioFrame.from_ndarray(silent, format=frame.format.name, layout=frame.layout.name)
+        out.sample_rate = frame.sample_rate
+        out.pts = frame.pts
+        if frame.time_base is not None:
+            out.time_base = frame.time_base
+        return out
+    return callback
+
+# ========================================
+# CLI: replay a WAV file
+# ========================================
+def replay(path, voice, chunk_ms=20, realtime=False, whole=False):
+    # Feeds a file in webrtc-sized chunks, optionally at real-time pace;
+    # whole=True skips the VAD and recognizes the file as one utterance
+    samples = read_wav(path)
+    if whole:
+        voice.submit(np.clip(samples, -32768, 32767).astype(np.int16))
+        voice.wait_idle()
+        return voice.results()
+    chunk = RATE * chunk_ms // 1000
+    for i in range(0, len(samples), chunk):
+        voice.feed(samples[i:i + chunk])
+        if realtime:
+            time.sleep(chunk_ms / 1000)
+    voice.finish()
+    voice.wait_idle()
+    return voice.results()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Replay a WAV file through JyotishAI voice input")
+    parser.add_argument("wav", nargs="+")
+    parser.add_argument("--replay", default=None, help="replay script (JSON) instead of Google recognition")
+    parser.add_argument("--realtime", action="store_true", help="feed audio at real-time pace")
+    parser.add_argument("--whole", action="store_true", help="skip the VAD, recognize each file as one utterance")
+    parser.add_argument("--min-confidence", type=float, default=MIN_CONFIDENCE)
+    args = parser.parse_args(argv)
+
+    recognizer = make_recognizer(args.replay)
+    for path in args.wav:
+        voice = VoiceInput(recognizer, min_confidence=args.min_confidence)
+        start = time.perf_counter()
+        results = replay(path, voice, realtime=args.realtime, whole=args.whole)
+        elapsed = (time.perf_counter() - start) * 1000
+        print(f"{path}: {voice.utterances} utterance(s), {elapsed:.0f} ms")
+        for r in results:
+            print(f"  [{r.language} {r.confidence:.2f} {r.ms:.0f} ms] {r.text}")
+        if not results:
+            print("  (nothing recognized)")
+
+
+if __name__ == "__main__":
+    main()
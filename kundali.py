@@ -3,20 +3,13 @@
 # FYP 2025 | 100% Local | Works on "hi", "how are you", and astrology
 
 import streamlit as st
-import os
-import tempfile
-import re
 import random
-import cv2
-import av
-import numpy as np
-import joblib
 from datetime import datetime
-from sklearn.dummy import DummyClassifier
-from streamlit_webrtc import webrtc_streamer, WebRtcMode, RTCConfiguration
-import speech_recognition as sr
-from gtts import gTTS
-import ollama
+from jyotish.client import get_backend
+from jyotish.history import Conversation, PAGE, purge_stale
+from jyotish.tts import TTSEngine
+from jyotish.parser import parse
+from jyotish.tracing import span, trace
 
 # ========================================
 # 1. FIRST: PAGE CONFIG
@@ -29,47 +22,16 @@ st.set_page_config(
 )
 
 # ========================================
-# 2. DUMMY MODEL (AUTO CREATE)
+# 2. BACKEND (in-process jyotish.core, or the HTTP service
+#    when JYOTISH_API_URL is set)
 # ========================================
-@st.cache_resource
-def ensure_model():
-    path = "model/jyotish_model.pkl"
-    if not os.path.exists(path):
-        os.makedirs("model", exist_ok=True)
-        dummy = DummyClassifier(strategy="constant", constant=1)
-        dummy.fit([[0, 0]], [1])
-        joblib.dump(dummy, path)
-    return path
-
-@st.cache_resource
-def load_model():
-    path = ensure_model()
-    try:
-        with open(path, "rb") as f:
-            return pickle.load(f)
-    except:
-        try:
-            return joblib.load(path)
-        except:
-            return None
-
-model = load_model()
+backend = get_backend()
 
 # ========================================
-# 3. LOAD RULES
+# 3. RULES
+# data/rules/jyotish_rules.json is compiled by jyotish.rules behind the
+# backend and recompiled only when the file changes
 # ========================================
-@st.cache_data
-def load_rules():
-    rules = {'career': [], 'marriage': [], 'health': []}
-    try:
-        for q in rules:
-            with open(f"data/rules/{q}.txt", "r", encoding="utf-8") as f:
-                rules[q] = [line.strip() for line in f if line.strip()]
-    except:
-        pass
-    return rules
-
-rules = load_rules()
 
 # ========================================
 # 4. HEADER
@@ -82,38 +44,26 @@ lang = st.sidebar.selectbox("Language / भाषा", ["English", "नेपा
 # ========================================
 # 5. KUNDALI
 # ========================================
-def get_kundali(birth_date):
-    np.random.seed(sum(ord(c) for c in birth_date) % 2**32)
-    signs = ['मेष', 'वृष', 'मिथुन', 'कर्कट', 'सिंह', 'कन्या', 'तुला', 'वृश्चिक', 'धनु', 'मकर', 'कुम्भ', 'मीन']
-    return {k: np.random.choice(signs) for k in ['lagna', 'sun', 'moon']}
+def get_kundali(birth_date, birth_time=None, place=None):
+    birth = {'birth_date': birth_date, 'birth_time': birth_time, 'place': place}
+    return backend.charts([birth])[0]['nepali']
 
 # ========================================
 # 6. INPUT PARSER
 # ========================================
 def extract_input(text):
-    date_match = re.search(r'\d{4}-\d{2}-\d{2}', text)
-    birth_date = date_match.group() if date_match else None
-    q_map = {
-        'career': 'career', 'करियर': 'career', 'job': 'career',
-        'marriage': 'marriage', 'विवाह': 'marriage', 'बिहे': 'marriage',
-        'health': 'health', 'स्वास्थ्य': 'health'
-    }
-    text_lower = text.lower()
-    question = next((q_map[w] for w in text_lower.split() if w in q_map), None)
-    return birth_date, question
+    birth_date, question = parse(text)
+    # Rules and remedies here are keyed on 'career', 'marriage', ...
+    return birth_date, question.rstrip('?').lower() if question else None
 
 # ========================================
 # 7. GENERAL CHAT (Ollama)
 # ========================================
-def general_chat(prompt):
-    try:
-        res = ollama.chat(model='llama3.2:1b', messages=[{
-            'role': 'user',
-            'content': f"Reply in {lang} only, short: {prompt}"
-        }])
-        return res['message']['content']
-    except:
-        return "I'm here!" if lang == "English" else "म यहाँ छु!"
+def general_chat(prompt, stream=False, context=None):
+    # Only called for messages without a birth date + question, which the
+    # backend answers as general chat
+    tokens = backend.reply(prompt, lang, context)
+    return tokens if stream else "".join(tokens)
 
 # ========================================
 # 8. ASTROLOGY PREDICTION
@@ -121,85 +71,102 @@ def general_chat(prompt):
 def predict_astrology(birth_date, question):
     kundali = get_kundali(birth_date)
     age = datetime.now().year - int(birth_date[:4])
+    # Placements matching the rule book for this question (+ its remedy)
+    reading = backend.rules([{'birth_date': birth_date, 'question': question}], lang)[0]
 
-    # English
-    if lang == "English":
+    if reading['effects']:
+        base = "\n".join(f"- {effect}" for effect in reading['effects'])
+    elif lang == "English":
         rule_pool = {
-            'career': [f"Career improves after {age+2} years.", "Success in job at {age+1}."],
+            'career': [f"Career improves after {age+2} years.", f"Success in job at {age+1}."],
             'marriage': [f"Marriage likely at age {age+1}.", "Good match soon."],
             'health': [f"Health stable under {kundali['lagna']} influence."]
         }.get(question, ["Good fortune."])
         base = random.choice(rule_pool)
-        remedies = {
-            'career': "Donate banana on Thursday.",
-            'marriage': "Offer milk to Shivling on Monday.",
-            'health': "Chant Hanuman Chalisa on Tuesday."
-        }
     else:
-        # Nepali
-        pool = rules.get(question, [f"तपाईंको {question} राम्रो छ।"])
-        base = random.choice(pool) if isinstance(pool, list) else pool
-        base = base.format(lagna=kundali['lagna'], sun=kundali['sun'], moon=kundali['moon'], age=age)
-        remedies = {
-            'career': "बिहीबार केरा दान गर्नुहोस्।",
-            'marriage': "सोमबार शिवलिंगमा दूध चढाउनुहोस्।",
-            'health': "मंगलबार हनुमान चालिसा पाठ गर्नुहोस्।"
-        }
-
-    remedy = remedies.get(question, "Do regular puja." if lang == "English" else "नियमित पूजा गर्नुहोस्।")
-    response = f"{base}\n\n**Remedy / उपाय:** {remedy}"
+        base = f"तपाईंको {question} राम्रो छ।"
+
+    response = f"{base}\n\n**Remedy / उपाय:** {reading['remedy']}"
 
     prefix = "Birth:" if lang == "English" else "जन्म:"
     return f"**{prefix}** {birth_date}\n**Lagna:** {kundali['lagna']} | **Sun:** {kundali['sun']} | **Moon:** {kundali['moon']}\n\n{response}"
 
 # ========================================
-# 9. VOICE INPUT
+# 9. VOICE INPUT (browser mic, VAD, both languages at once)
 # ========================================
-def recognize_speech():
-    r = sr.Recognizer()
-    try:
-        with sr.Microphone() as source:
-            r.adjust_for_ambient_noise(source, 0.5)
-            st.info("Listening... (5 sec)")
-            audio = r.listen(source, timeout=5, phrase_time_limit=5)
-        try:
-            return r.recognize_google(audio, language="ne-NP")
-        except:
-            return r.recognize_google(audio, language="en-IN")
-    except:
-        st.warning("No speech. Type.")
-        return ""
+def voice_input():
+    # One per session, fed by the browser mic (webrtc audio track); the
+    # recognizer comes from JYOTISH_STT (Google by default)
+    from jyotish.voice import VoiceInput
+    if "voice_input" not in st.session_state:
+        st.session_state.voice_input = VoiceInput()
+    return st.session_state.voice_input
+
+def voice_stream():
+    # Audio-only webrtc stream for voice mode outside a video call
+    from streamlit_webrtc import webrtc_streamer, WebRtcMode, RTCConfiguration
+    from jyotish.voice import audio_callback
+    return webrtc_streamer(
+        key="voice_stream",
+        mode=WebRtcMode.SENDRECV,
+        rtc_configuration=RTCConfiguration({"iceServers": [
+            {"urls": "stun:stun.l.google.com:19302"}
+        ]}),
+        audio_frame_callback=audio_callback(voice_input()),
+        media_stream_constraints={"video": False, "audio": True},
+        async_processing=True
+    )
+
+@st.fragment(run_every=0.5)
+def voice_listener():
+    # Polls finished transcripts; the script never waits on the mic
+    voice = st.session_state.get("voice_input")
+    if voice is None:
+        return
+    results = voice.results()
+    if results:
+        st.session_state.voice_prompt = results[-1].text
+        st.rerun()
+    st.caption(f"Mic: {voice.stats()['state']}")
 
 # ========================================
 # 10. VOICE OUTPUT ENGLISH NEPASLI
 # ========================================
-def speak_text(text):
-    clean = re.sub(r'\*\*|\*|_|\n', ' ', text).strip()
-    clean = clean.split("Remedy|उपाय")[0]
-    try:
-        tts = gTTS(clean, lang="en" if lang == "English" else "hi", slow=False)
-        f = tempfile.NamedTemporaryFile(delete=False, suffix=".mp3")
-        tts.save(f.name)
-        return f.name
-    except:
-        return None
+@st.cache_resource
+def tts_engine():
+    return TTSEngine()
+
+def speak_text_async(text):
+    # Synthesis runs on the TTS executor; audio_player() attaches it when ready
+    return tts_engine().submit(text, lang)
+
+@st.fragment(run_every=0.5)
+def audio_player():
+    job = st.session_state.get("tts_job")
+    if job is None or not job.done():
+        return
+    audio = job.result()
+    if audio:
+        st.audio(audio.getvalue(), format=tts_engine().mime)
 
 # ========================================
 # 11. VIDEO CALL services
 # ========================================
-def video_frame_callback(frame):
-    img = frame.to_ndarray(format="bgr24")
-    gray = cv2.cvtColor(img, cv2.COLOR_BGR2GRAY)
-    faces = cv2.CascadeClassifier(cv2.data.haarcascades + 'haarcascade_frontalface_default.xml')\
-        .detectMultiScale(gray, 1.1, 4)
-    for (x, y, w, h) in faces:
-        cv2.rectangle(img, (x, y), (x+w, y+h), (0, 255, 0), 2)
-    return av.VideoFrame.from_ndarray(img, format="bgr24")
-
 if st.button("Start Video Call", key="start_video"):
     st.session_state.in_video_call = True
 
 if st.session_state.get("in_video_call", False):
+    # WebRTC, av and OpenCV are only imported once a call starts
+    from streamlit_webrtc import webrtc_streamer, WebRtcMode, RTCConfiguration
+    from jyotish.video import AsyncFacePipeline, frame_callback
+    from jyotish.voice import audio_callback
+
+    # One pipeline per session (boxes, timing, drop counters); detection
+    # itself runs on the shared frame worker pool
+    if "face_pipeline" not in st.session_state:
+        st.session_state.face_pipeline = AsyncFacePipeline()
+    face_pipeline = st.session_state.face_pipeline
+
     st.subheader("Video Consultation")
     webrtc_streamer(
         key="video",
@@ -207,8 +174,10 @@ if st.session_state.get("in_video_call", False):
         rtc_configuration=RTCConfiguration({"iceServers": [
             {"urls": "stun:stun.l.google.com:19302"}
         ]}),
-        video_frame_callback=video_frame_callback,
-        media_stream_constraints={"video": True, "audio": True}
+        video_frame_callback=frame_callback(face_pipeline),
+        audio_frame_callback=audio_callback(voice_input()),
+        media_stream_constraints={"video": True, "audio": True},
+        async_processing=True
     )
     if st.button("End Call", key="end_call"):
         st.session_state.in_video_call = False
@@ -219,52 +188,85 @@ if st.session_state.get("in_video_call", False):
 # ========================================
 st.subheader("Chat with JyotishAI")
 
-if "messages" not in st.session_state:
+@st.cache_resource
+def purge_old_history():
+    # Once per process: drop spill logs of long-finished sessions
+    return purge_stale()
+
+if "conversation" not in st.session_state:
+    purge_old_history()
     welcome = (
         "Hello! Ask anything: `hi`, `how are you`, or `2004-06-11, career?`"
         if lang == "English" else
         "नमस्ते! `hi`, `तपाईं कस्तो हुनुहुन्छ?`, वा `2004-06-11, करियर?` सोध्नुहोस्"
     )
-    st.session_state.messages = [{"role": "assistant", "content": welcome}]
-
-for msg in st.session_state.messages:
-    with st.chat_message(msg["role"]):
-        st.markdown(msg["content"])
+    st.session_state.conversation = Conversation()
+    st.session_state.conversation.append("assistant", welcome)
+conversation = st.session_state.conversation
+
+# Only the latest page(s) render; older turns are spilled to disk
+shown = st.session_state.get("show_messages", PAGE)
+hidden = len(conversation) - shown
+if hidden > 0 and st.button(f"Load earlier messages ({hidden} more)", key="load_earlier"):
+    st.session_state.show_messages = shown + PAGE
+    st.rerun()
+with span('render_history'):
+    for msg in conversation.latest(shown):
+        with st.chat_message(msg["role"]):
+            st.markdown(msg["content"])
 
 col1, col2 = st.columns([4, 1])
 with col1:
     prompt = st.chat_input("Type here...")
 with col2:
-    if st.button("Speak", key="voice"):
-        with st.spinner("Listening..."):
-            prompt = recognize_speech()
+    voice_on = st.session_state.get("voice_on", False)
+    if st.button("Stop Mic" if voice_on else "Speak", key="voice"):
+        st.session_state.voice_on = not voice_on
+        st.rerun()
+# The video call already carries the mic; otherwise open an audio-only stream
+if st.session_state.get("voice_on") and not st.session_state.get("in_video_call"):
+    voice_stream()
+if st.session_state.get("voice_on") or st.session_state.get("in_video_call"):
+    voice_listener()
+if not prompt:
+    prompt = st.session_state.pop("voice_prompt", None)
 
 if prompt:
     prompt = prompt.strip()
     if not prompt:
         st.stop()
 
-    st.session_state.messages.append({"role": "user", "content": prompt})
-    with st.chat_message("user"):
-        st.markdown(prompt)
-
-    birth_date, question = extract_input(prompt)
-
-    with st.chat_message("assistant"):
-        if birth_date and question:
-            with st.spinner("Predicting..."):
-                response = predict_astrology(birth_date, question)
-        else:
-            response = general_chat(prompt)
-
-        st.markdown(response)
-        st.session_state.messages.append({"role": "assistant", "content": response})
-
-        # Speak
-        audio = speak_text(response)
-        if audio:
-            st.audio(audio, format="audio/mp3")
-            os.unlink(audio)
+    # One trace per turn, tagged with the session id so a session's turns
+    # (and their spans on the service) can be found together
+    with trace(conversation.session_id):
+        # A new message makes the previous reply's audio stale
+        stale_job = st.session_state.pop("tts_job", None)
+        if stale_job is not None:
+            stale_job.cancel()
+
+        context = conversation.context()
+        conversation.append("user", prompt)
+        with st.chat_message("user"):
+            st.markdown(prompt)
+
+        with span('parse'):
+            birth_date, question = extract_input(prompt)
+
+        with st.chat_message("assistant"):
+            if birth_date and question:
+                with st.spinner("Predicting..."), span('predict_astrology'):
+                    response = predict_astrology(birth_date, question)
+                st.markdown(response)
+            else:
+                # Tokens render as they arrive; the full text is saved once complete
+                with span('stream_reply'):
+                    response = st.write_stream(general_chat(prompt, stream=True, context=context))
+
+            conversation.append("assistant", response)
+
+            # Speak in the background: text is already on screen
+            st.session_state.tts_job = speak_text_async(response)
+            audio_player()
 
 # ========================================
 # 13. SIDEBAR FINAL
@@ -277,6 +279,11 @@ with st.sidebar:
         "**Offline • Voice • Video**\n"
         "**Nov 11, 2025 | 10:23 PM**"
     )
+    try:
+        st.caption(f"Model: {backend.metrics()['model']}")
+    except Exception:
+        st.caption("Backend metrics unavailable")
     if st.button("Clear Chat"):
-        st.session_state.messages = []
+        conversation.clear()
+        st.session_state.show_messages = PAGE
         st.rerun()
\ No newline at end of file